@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth import authenticate, get_user_model
 from .models import CustomUser, Brand, Category, Warehouse, Shelf, Supplier, SupplierAddress, SupplierContact, SupplierPaymentTerm, SupplierBank, ParentCompany, ParentCompanyPaymentTerm, Customer, CustomerAddress, CustomerContact, CustomerPaymentTerm, Broker, BrokerContact, Forwarder, ForwarderContact, Inventory
 from django.conf import settings
+from django.db import transaction
 
 User = get_user_model()
 
@@ -79,10 +80,34 @@ class CategoryTreeSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'level', 'children', 'created_at', 'updated_at']
     
     def get_children(self, obj):
-        children = Category.objects.filter(parent=obj)
+        # Use the preloaded tree when the view provides one
+        children_by_parent = self.context.get('children_by_parent')
+        if children_by_parent is not None:
+            children = children_by_parent.get(obj.id, [])
+        else:
+            children = Category.objects.filter(parent=obj)
         if not children:
             return []
-        return CategoryTreeSerializer(children, many=True).data
+        return CategoryTreeSerializer(children, many=True, context=self.context).data
+
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    A ModelSerializer that takes an additional `fields` argument that
+    controls which fields should be displayed.
+    """
+    def __init__(self, *args, **kwargs):
+        # Don't pass the 'fields' arg up to the superclass
+        fields = kwargs.pop('fields', None)
+
+        # Instantiate the superclass normally
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            # Drop any fields that are not specified in the `fields` argument.
+            allowed = set(fields)
+            existing = set(self.fields)
+            for field_name in existing - allowed:
+                self.fields.pop(field_name)
 
 class ShelfSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(required=False)  # For handling updates
@@ -92,7 +117,7 @@ class ShelfSerializer(serializers.ModelSerializer):
         fields = ['id', 'aisle', 'shelf', 'info']
         read_only_fields = ['id']
 
-class WarehouseSerializer(serializers.ModelSerializer):
+class WarehouseSerializer(DynamicFieldsModelSerializer):
     shelves = ShelfSerializer(many=True, read_only=True)
     
     class Meta:
@@ -199,25 +224,6 @@ class SupplierPaymentTermSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id']
 
-class DynamicFieldsModelSerializer(serializers.ModelSerializer):
-    """
-    A ModelSerializer that takes an additional `fields` argument that
-    controls which fields should be displayed.
-    """
-    def __init__(self, *args, **kwargs):
-        # Don't pass the 'fields' arg up to the superclass
-        fields = kwargs.pop('fields', None)
-
-        # Instantiate the superclass normally
-        super().__init__(*args, **kwargs)
-
-        if fields is not None:
-            # Drop any fields that are not specified in the `fields` argument.
-            allowed = set(fields)
-            existing = set(self.fields)
-            for field_name in existing - allowed:
-                self.fields.pop(field_name)
-
 class SupplierSerializer(DynamicFieldsModelSerializer):
     addresses = SupplierAddressSerializer(many=True, read_only=True)
     contacts = SupplierContactSerializer(many=True, read_only=True)
@@ -382,7 +388,8 @@ class ParentCompanySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_customers(self, obj):
-        customers = Customer.objects.filter(parent_company=obj)
+        # Uses the customers prefetched by ParentCompanyView when available
+        customers = obj.customer_set.all()
         return [{'id': customer.id, 'name': customer.name} for customer in customers]
 
 class ParentCompanyCreateUpdateSerializer(serializers.ModelSerializer):
@@ -502,6 +509,7 @@ class CustomerCreateUpdateSerializer(serializers.ModelSerializer):
             
         return data
     
+    @transaction.atomic
     def create(self, validated_data):
         addresses_data = validated_data.pop('addresses', [])
         contacts_data = validated_data.pop('contacts', [])
@@ -523,6 +531,7 @@ class CustomerCreateUpdateSerializer(serializers.ModelSerializer):
             
         return customer
     
+    @transaction.atomic
     def update(self, instance, validated_data):
         addresses_data = validated_data.pop('addresses', None)
         contacts_data = validated_data.pop('contacts', None)
@@ -651,11 +660,13 @@ class BrokerCreateUpdateSerializer(serializers.ModelSerializer):
         contacts_data = validated_data.pop('contacts', [])
         
         broker = Broker.objects.create(**validated_data)
-        
-        # Create contacts
-        for contact_data in contacts_data:
-            BrokerContact.objects.create(broker=broker, **contact_data)
-            
+
+        # Create contacts in a single INSERT
+        BrokerContact.objects.bulk_create([
+            BrokerContact(broker=broker, **contact_data)
+            for contact_data in contacts_data
+        ])
+
         return broker
     
     def update(self, instance, validated_data):
@@ -5,7 +5,7 @@ from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
 from .serializers import LoginSerializer
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.db.models import Prefetch, Q
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 import pandas as pd
@@ -411,8 +411,12 @@ class CategoryView(APIView, PageNumberPagination):
 
         # Handle tree view (only for root level when requested)
         if tree_view and not parent_id and not search:
-            root_categories = Category.objects.filter(parent=None)
-            serializer = CategoryTreeSerializer(root_categories, many=True)
+            children_by_parent = self._load_category_tree()
+            serializer = CategoryTreeSerializer(
+                children_by_parent.get(None, []),
+                many=True,
+                context={'children_by_parent': children_by_parent}
+            )
             return Response({
                 'success': True,
                 'data': serializer.data
@@ -421,6 +425,8 @@ class CategoryView(APIView, PageNumberPagination):
         # Pagination for flat view
         page = self.paginate_queryset(categories, request)
         if page is not None:
+            # Resolve parents in memory so level and full_path don't query per ancestor
+            self._attach_ancestors(page)
             serializer = CategorySerializer(page, many=True)
             paginated_response = self.get_paginated_response(serializer.data)
             
@@ -532,6 +538,43 @@ class CategoryView(APIView, PageNumberPagination):
             'data': None
         }, status=status.HTTP_200_OK)
     
+    def _load_category_tree(self):
+        """
+        Load every category in one query and link parents and children in memory.
+        Returns the child lists keyed by parent id.
+        """
+        categories_by_id = {category.id: category for category in Category.objects.all()}
+        children_by_parent = {}
+        for category in categories_by_id.values():
+            if category.parent_id:
+                category.parent = categories_by_id[category.parent_id]
+            children_by_parent.setdefault(category.parent_id, []).append(category)
+        return children_by_parent
+    
+    def _attach_ancestors(self, categories):
+        """
+        Load the ancestors of the given categories, one query per tree level,
+        and link each category to its parent in memory.
+        """
+        loaded = {category.id: category for category in categories}
+        pending = list(categories)
+        while True:
+            missing_parent_ids = {
+                category.parent_id for category in pending
+                if category.parent_id and category.parent_id not in loaded
+            }
+            if not missing_parent_ids:
+                break
+            parents = Category.objects.in_bulk(missing_parent_ids)
+            loaded.update(parents)
+            pending = list(parents.values())
+        
+        for category in loaded.values():
+            # A parent deleted since the page was read is left to the lazy relation
+            parent = loaded.get(category.parent_id)
+            if parent is not None:
+                category.parent = parent
+    
     def _get_all_descendants(self, category):
         """Helper method to get all descendants of a category"""
         descendants = []
@@ -558,10 +601,14 @@ class CategoryChildrenView(APIView):
 class WarehouseView(APIView, PageNumberPagination):
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        # Load the shelves WarehouseSerializer renders up front
+        return Warehouse.objects.prefetch_related('shelves')
+
     def get(self, request, pk=None):
         # If pk is provided, return a single warehouse with its shelves
         if pk:
-            warehouse = get_object_or_404(Warehouse, pk=pk)
+            warehouse = get_object_or_404(self.get_queryset(), pk=pk)
             serializer = WarehouseSerializer(warehouse)
             return Response({
                 'success': True,
@@ -580,8 +627,23 @@ class WarehouseView(APIView, PageNumberPagination):
         sort_by = request.query_params.get('sort_by', 'name')
         sort_direction = request.query_params.get('sort_direction', 'asc')
         
-        # Query warehouses
-        warehouses = Warehouse.objects.all()
+        # Optional sparse fieldset, e.g. ?fields=id,name
+        fields = [
+            field.strip() for field in request.query_params.get('fields', '').split(',') if field.strip()
+        ] or None
+        if fields is not None:
+            unknown_fields = [field for field in fields if field not in WarehouseSerializer().fields]
+            if unknown_fields:
+                return Response({
+                    'success': False,
+                    'errors': {'fields': f"Unknown fields: {', '.join(unknown_fields)}"}
+                }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Query warehouses; only load the shelves when they are rendered
+        if fields is None or 'shelves' in fields:
+            warehouses = self.get_queryset()
+        else:
+            warehouses = Warehouse.objects.all()
 
         # Apply field-specific search filters
         if id_search:
@@ -612,7 +674,7 @@ class WarehouseView(APIView, PageNumberPagination):
         # Pagination
         page = self.paginate_queryset(warehouses, request)
         if page is not None:
-            serializer = WarehouseSerializer(page, many=True)
+            serializer = WarehouseSerializer(page, many=True, fields=fields)
             paginated_response = self.get_paginated_response(serializer.data)
             
             return Response({
@@ -628,7 +690,7 @@ class WarehouseView(APIView, PageNumberPagination):
             })
 
         # Fallback if pagination fails
-        serializer = WarehouseSerializer(warehouses, many=True)
+        serializer = WarehouseSerializer(warehouses, many=True, fields=fields)
         return Response({
             'success': True,
             'data': serializer.data
@@ -694,10 +756,16 @@ class WarehouseView(APIView, PageNumberPagination):
 class SupplierView(APIView, PageNumberPagination):
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        # Load everything SupplierSerializer renders up front
+        return Supplier.objects.select_related('payment_term').prefetch_related(
+            'addresses', 'contacts', 'banks'
+        )
+
     def get(self, request, pk=None):
         # If pk is provided, return a single supplier with all related data
         if pk:
-            supplier = get_object_or_404(Supplier, pk=pk)
+            supplier = get_object_or_404(self.get_queryset(), pk=pk)
             serializer = SupplierSerializer(supplier)
             return Response({
                 'success': True,
@@ -716,7 +784,7 @@ class SupplierView(APIView, PageNumberPagination):
         sort_direction = request.query_params.get('sort_direction', 'asc')
         
         # Query suppliers
-        suppliers = Supplier.objects.all()
+        suppliers = self.get_queryset()
 
         # Apply field-specific search filters
         if name_search:
@@ -828,10 +896,16 @@ class SupplierView(APIView, PageNumberPagination):
 class ParentCompanyView(APIView, PageNumberPagination):
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        # Load the payment term and the id/name of each customer up front
+        return ParentCompany.objects.select_related('payment_term').prefetch_related(
+            Prefetch('customer_set', queryset=Customer.objects.only('id', 'name', 'parent_company'))
+        )
+
     def get(self, request, pk=None):
         # If pk is provided, return a single parent company with its payment terms and customers
         if pk:
-            parent_company = get_object_or_404(ParentCompany, pk=pk)
+            parent_company = get_object_or_404(self.get_queryset(), pk=pk)
             serializer = ParentCompanySerializer(parent_company)
             return Response({
                 'success': True,
@@ -850,7 +924,7 @@ class ParentCompanyView(APIView, PageNumberPagination):
         sort_direction = request.query_params.get('sort_direction', 'asc')
         
         # Query parent companies
-        parent_companies = ParentCompany.objects.all()
+        parent_companies = self.get_queryset()
 
         # Apply field-specific search filters
         if id_search:
@@ -958,10 +1032,16 @@ class ParentCompanyView(APIView, PageNumberPagination):
 class CustomerView(APIView, PageNumberPagination):
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        # Load everything CustomerSerializer renders up front
+        return Customer.objects.select_related(
+            'parent_company', 'payment_term'
+        ).prefetch_related('addresses', 'contacts')
+
     def get(self, request, pk=None):
         # If pk is provided, return a single customer with all related data
         if pk:
-            customer = get_object_or_404(Customer, pk=pk)
+            customer = get_object_or_404(self.get_queryset(), pk=pk)
             serializer = CustomerSerializer(customer)
             return Response({
                 'success': True,
@@ -985,7 +1065,7 @@ class CustomerView(APIView, PageNumberPagination):
         sort_direction = request.query_params.get('sort_direction', 'asc')
         
         # Query customers
-        customers = Customer.objects.all()
+        customers = self.get_queryset()
 
         # Apply field-specific search filters
         if name_search:
@@ -1248,10 +1328,14 @@ class BrokerView(APIView, PageNumberPagination):
 class ForwarderView(APIView, PageNumberPagination):
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        # Load everything ForwarderSerializer renders up front
+        return Forwarder.objects.prefetch_related('contacts')
+
     def get(self, request, pk=None):
         # If pk is provided, return a single forwarder with all related data
         if pk:
-            forwarder = get_object_or_404(Forwarder, pk=pk)
+            forwarder = get_object_or_404(self.get_queryset(), pk=pk)
             serializer = ForwarderSerializer(forwarder)
             return Response({
                 'success': True,
@@ -1274,7 +1358,7 @@ class ForwarderView(APIView, PageNumberPagination):
         sort_direction = request.query_params.get('sort_direction', 'asc')
         
         # Query forwarders
-        forwarders = Forwarder.objects.all()
+        forwarders = self.get_queryset()
 
         # Apply field-specific search filters
         if company_name_search:
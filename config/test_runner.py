@@ -0,0 +1,71 @@
+"""
+Test runner used by config.test_settings.
+"""
+
+import time
+import unittest
+
+from django.contrib.contenttypes.management import create_contenttypes
+from django.db.models.signals import post_migrate
+from django.test.runner import DiscoverRunner
+
+
+class TimedTextTestResult(unittest.TextTestResult):
+    """Text result that records how long each test took, setUp included."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.test_durations = []
+
+    def startTest(self, test):
+        self._test_started_at = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        self.test_durations.append((time.perf_counter() - self._test_started_at, test.id()))
+
+
+class TestRunner(DiscoverRunner):
+    """Discover runner that skips the post-migrate ContentType/Permission rows.
+
+    Access checks in this project rely on is_staff and group names, never on
+    model permissions, so the test database does not need those rows.
+
+    Pass --slowest N to list the N slowest tests after the run.
+    """
+
+    def __init__(self, slowest=None, **kwargs):
+        super().__init__(**kwargs)
+        self.slowest = slowest
+        if self.slowest:
+            # Timings are recorded in this process, so run the tests here too
+            self.parallel = 1
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--slowest', type=int, metavar='N',
+            help='Report the N slowest tests. Forces a serial run.',
+        )
+
+    def get_resultclass(self):
+        # --debug-sql and --pdb keep their own result classes
+        resultclass = super().get_resultclass()
+        if resultclass is None and self.slowest:
+            return TimedTextTestResult
+        return resultclass
+
+    def setup_databases(self, **kwargs):
+        post_migrate.disconnect(create_contenttypes)
+        post_migrate.disconnect(dispatch_uid='django.contrib.auth.management.create_permissions')
+        return super().setup_databases(**kwargs)
+
+    def run_suite(self, suite, **kwargs):
+        result = super().run_suite(suite, **kwargs)
+        if hasattr(result, 'test_durations'):
+            self.log(f'\nSlowest {self.slowest} tests:')
+            for duration, test_id in sorted(result.test_durations, reverse=True)[:self.slowest]:
+                self.log(f'{duration:8.3f}s  {test_id}')
+        return result
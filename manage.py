@@ -6,6 +6,10 @@ import sys
 
 def main():
     """Run administrative tasks."""
+    # The test command defaults to the test settings (fast password hashing,
+    # no migrations); --settings still overrides this
+    if sys.argv[1:2] == ['test']:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.test_settings')
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
     try:
         from django.core.management import execute_from_command_line
@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+User = get_user_model()
+
+
+class AdminAPITestCase(APITestCase):
+    """Base class for admin API tests.
+
+    Creates the authenticated test user once per class and logs the API
+    client in as that user before each test. Subclasses set user_fields to
+    give that user extra attributes such as is_staff or a role.
+    """
+
+    user_fields = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create the shared test user; nothing here needs a real password."""
+        cls.user = User(
+            username='testuser',
+            email='test@example.com',
+            **cls.user_fields
+        )
+        cls.user.set_unusable_password()
+        cls.user.save()
+
+    def setUp(self):
+        """Authenticate the API client APITestCase provides."""
+        self.client.force_authenticate(user=self.user)
+
+    def assert_ok(self, response, status_code=status.HTTP_200_OK):
+        """Assert the response has the given status and a successful envelope."""
+        if response.status_code != status_code or not response.data.get('success'):
+            self.fail(f'Expected {status_code} with success=True, got {response.status_code}: {response.data}')
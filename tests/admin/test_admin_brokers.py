@@ -1,5 +1,7 @@
+from functools import cache
 from django.urls import reverse
 from django.test import TestCase
+from django.contrib.auth.hashers import make_password
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
@@ -7,16 +9,23 @@ from admin_api.models import Broker, BrokerContact
 
 User = get_user_model()
 
+
+@cache
+def _hashed_password(raw_password):
+    """Hash each fixture password once per process instead of once per test."""
+    return make_password(raw_password)
+
+
 class BrokerViewTests(TestCase):
     """Tests for the Broker API views."""
 
     def setUp(self):
         """Set up test data."""
         # Create a test user
-        self.user = User.objects.create_user(
+        self.user = User.objects.create(
             username='testuser',
             email='test@example.com',
-            password='testpassword'
+            password=_hashed_password('testpassword')
         )
         
         # Create test brokers
@@ -198,7 +207,9 @@ class BrokerViewTests(TestCase):
             ]
         }
         
-        response = self.client.post(self.list_url, data, format='json')
+        # 1 broker INSERT + 1 bulk INSERT for the contacts + 1 SELECT to serialize them
+        with self.assertNumQueries(3):
+            response = self.client.post(self.list_url, data, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(response.data['success'])
@@ -302,17 +313,17 @@ class BrokerViewTests(TestCase):
         # Create a client without authentication
         client = APIClient()
         
-        response = client.get(self.list_url)
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-        
-        response = client.get(self.detail_url)
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-        
-        response = client.post(self.list_url, {})
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-        
-        response = client.put(self.detail_url, {})
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-        
-        response = client.delete(self.detail_url)
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
+        requests = [
+            ('get', self.list_url, None),
+            ('get', self.detail_url, None),
+            ('post', self.list_url, {}),
+            ('put', self.detail_url, {}),
+            ('delete', self.detail_url, None),
+        ]
+        for method, url, data in requests:
+            with self.subTest(method=method, url=url):
+                if data is None:
+                    response = getattr(client, method)(url)
+                else:
+                    response = getattr(client, method)(url, data)
+                self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
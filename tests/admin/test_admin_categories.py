@@ -1,97 +1,96 @@
+from unittest.mock import patch
 from django.test import TestCase
 from django.urls import reverse
-from rest_framework.test import APIClient
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.tokens import RefreshToken
 from admin_api.models import Category
+from admin_api.views import CategoryView
 
 User = get_user_model()
 
+CATEGORIES_URL = reverse('admin_api:categories')
+
 class CategoryViewTests(TestCase):
     """Tests for the Category API endpoints"""
     
-    def setUp(self):
-        """Set up test data and authentication"""
-        self.client = APIClient()
-        self.categories_url = reverse('admin_api:categories')
-        
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data shared by every test in the class"""
         # Create admin user
-        self.admin_user = User.objects.create_user(
+        cls.admin_user = User(
             username='adminuser',
             email='admin@example.com',
-            password='adminpassword123',
             first_name='Admin',
             last_name='User',
             role='admin',
             user_access=['admin']
         )
+        cls.admin_user.set_unusable_password()
+        cls.admin_user.save()
         
-        # Create regular user (for testing permissions)
-        self.regular_user = User.objects.create_user(
-            username='regularuser',
-            email='regular@example.com',
-            password='regularpassword123',
-            first_name='Regular',
-            last_name='User',
-            role='user',
-            user_access=['inventory']
-        )
-        
-        # Create test categories with hierarchy
-        self.root_category1 = Category.objects.create(
-            name='Root Category 1'
-        )
-        
-        self.root_category2 = Category.objects.create(
-            name='Root Category 2'
-        )
+        # Create test categories with hierarchy; bulk INSERT the levels with siblings
+        cls.root_category1, cls.root_category2 = Category.objects.bulk_create([
+            Category(name='Root Category 1'),
+            Category(name='Root Category 2'),
+        ])
         
-        self.child_category1 = Category.objects.create(
-            name='Child Category 1',
-            parent=self.root_category1
-        )
+        cls.child_category1, cls.child_category2 = Category.objects.bulk_create([
+            Category(name='Child Category 1', parent=cls.root_category1),
+            Category(name='Child Category 2', parent=cls.root_category1),
+        ])
         
-        self.child_category2 = Category.objects.create(
-            name='Child Category 2',
-            parent=self.root_category1
-        )
-        
-        self.grandchild_category = Category.objects.create(
+        cls.grandchild_category = Category.objects.create(
             name='Grandchild Category',
-            parent=self.child_category1
+            parent=cls.child_category1
         )
         
-        # Authenticate as admin
-        self.admin_token = RefreshToken.for_user(self.admin_user).access_token
-        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.admin_token}')
-        
         # Category detail URL
-        self.category_detail_url = reverse('admin_api:category-detail', args=[self.root_category1.id])
+        cls.category_detail_url = reverse('admin_api:category-detail', args=[cls.root_category1.id])
         
         # New category data for creation tests
-        self.new_category_data = {
+        cls.new_category_data = {
             'name': 'New Category',
             'parent': None
         }
         
-        self.new_child_category_data = {
+        cls.new_child_category_data = {
             'name': 'New Child Category',
-            'parent': self.root_category2.id
+            'parent': cls.root_category2.id
         }
         
         # Update data for PUT tests
-        self.update_data = {
+        cls.update_data = {
             'name': 'Updated Category'
         }
 
+    def setUp(self):
+        """Set up authentication"""
+        self.client = APIClient()
+        
+        # Authenticate as admin
+        self.client.force_authenticate(user=self.admin_user)
+
+    def get_list_view(self, params):
+        """Call CategoryView directly, skipping middleware and URL routing"""
+        request = APIRequestFactory().get(CATEGORIES_URL, params)
+        force_authenticate(request, user=self.admin_user)
+        return CategoryView.as_view()(request)
+
     def test_get_categories_list(self):
         """Test retrieving list of categories"""
-        response = self.client.get(self.categories_url)
+        # 1 count + 1 page; every parent is already on the page
+        with self.assertNumQueries(2):
+            response = self.client.get(CATEGORIES_URL)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
         self.assertEqual(len(response.data['data']), 5)  # 5 categories total
         
+        # Ancestors are still resolved for nested categories
+        grandchild_data = next(cat for cat in response.data['data'] if cat['name'] == 'Grandchild Category')
+        self.assertEqual(grandchild_data['level'], 2)
+        self.assertEqual(grandchild_data['full_path'], 'Root Category 1 > Child Category 1 > Grandchild Category')
+        
         # Check pagination metadata
         self.assertIn('meta', response.data)
         self.assertIn('pagination', response.data['meta'])
@@ -99,21 +98,25 @@ class CategoryViewTests(TestCase):
 
     def test_get_root_categories(self):
         """Test retrieving only root categories"""
-        response = self.client.get(f"{self.categories_url}?parent=root")
+        # 1 count + 1 page; root rows have no ancestors to load
+        with self.assertNumQueries(2):
+            response = self.get_list_view({'parent': 'root'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
         self.assertEqual(len(response.data['data']), 2)  # 2 root categories
 
     def test_get_child_categories(self):
         """Test retrieving child categories of a specific parent"""
-        response = self.client.get(f"{self.categories_url}?parent={self.root_category1.id}")
+        response = self.get_list_view({'parent': self.root_category1.id})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
         self.assertEqual(len(response.data['data']), 2)  # 2 child categories under root_category1
 
     def test_get_tree_view(self):
         """Test retrieving categories in tree view"""
-        response = self.client.get(f"{self.categories_url}?tree=true")
+        # 1 category tree load, regardless of depth
+        with self.assertNumQueries(1):
+            response = self.client.get(f"{CATEGORIES_URL}?tree=true")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
         self.assertEqual(len(response.data['data']), 2)  # 2 root categories
@@ -130,14 +133,37 @@ class CategoryViewTests(TestCase):
 
     def test_get_categories_with_search(self):
         """Test retrieving categories with search parameter"""
-        response = self.client.get(f"{self.categories_url}?search=Child")
+        # 1 count + 1 page + 1 load of the root parents missing from the page
+        with self.assertNumQueries(3):
+            response = self.get_list_view({'search': 'Child'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
         self.assertEqual(len(response.data['data']), 3)  # 3 categories with 'Child' in name
 
+    def test_get_categories_loads_ancestors_per_level(self):
+        """Test that a page's missing ancestors are loaded one tree level per query"""
+        # 1 count + 1 page + 1 query each for the child and root levels
+        with self.assertNumQueries(4):
+            response = self.get_list_view({'search': 'Grandchild'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        grandchild_data = response.data['data'][0]
+        self.assertEqual(grandchild_data['level'], 2)
+        self.assertEqual(grandchild_data['full_path'], 'Root Category 1 > Child Category 1 > Grandchild Category')
+
+    def test_get_categories_with_missing_parent_falls_back_to_lazy_relation(self):
+        """Test that a parent missing from the ancestor load is fetched lazily instead of failing"""
+        with patch.object(Category.objects, 'in_bulk', return_value={}) as in_bulk:
+            response = self.get_list_view({'search': 'Grandchild'})
+        in_bulk.assert_called_once_with({self.child_category1.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['data'][0]['full_path'],
+            'Root Category 1 > Child Category 1 > Grandchild Category'
+        )
+
     def test_get_categories_with_sorting(self):
         """Test retrieving categories with sorting parameters"""
-        response = self.client.get(f"{self.categories_url}?sort_by=name&sort_direction=desc")
+        response = self.get_list_view({'sort_by': 'name', 'sort_direction': 'desc'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
         # First category should be 'Root Category 2' when sorted by name in descending order
@@ -166,7 +192,7 @@ class CategoryViewTests(TestCase):
 
     def test_create_root_category(self):
         """Test creating a new root category"""
-        response = self.client.post(self.categories_url, self.new_category_data, format='json')
+        response = self.client.post(CATEGORIES_URL, self.new_category_data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(response.data['success'])
         self.assertEqual(response.data['data']['name'], 'New Category')
@@ -178,7 +204,7 @@ class CategoryViewTests(TestCase):
 
     def test_create_child_category(self):
         """Test creating a new child category"""
-        response = self.client.post(self.categories_url, self.new_child_category_data, format='json')
+        response = self.client.post(CATEGORIES_URL, self.new_child_category_data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(response.data['success'])
         self.assertEqual(response.data['data']['name'], 'New Child Category')
@@ -194,7 +220,7 @@ class CategoryViewTests(TestCase):
             'name': '',  # Empty name
             'parent': None
         }
-        response = self.client.post(self.categories_url, invalid_data, format='json')
+        response = self.client.post(CATEGORIES_URL, invalid_data, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertFalse(response.data['success'])
         self.assertIn('errors', response.data)
@@ -206,7 +232,7 @@ class CategoryViewTests(TestCase):
             'name': 'Child Category 1',  # Already exists under root_category1
             'parent': self.root_category1.id
         }
-        response = self.client.post(self.categories_url, duplicate_data, format='json')
+        response = self.client.post(CATEGORIES_URL, duplicate_data, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertFalse(response.data['success'])
         self.assertIn('errors', response.data)
@@ -293,6 +319,6 @@ class CategoryViewTests(TestCase):
 
     def test_unauthenticated_access(self):
         """Test accessing category endpoints without authentication"""
-        self.client.credentials()  # Remove authentication
-        response = self.client.get(self.categories_url)
+        self.client.force_authenticate(user=None)  # Remove authentication
+        response = self.client.get(CATEGORIES_URL)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
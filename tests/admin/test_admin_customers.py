@@ -1,5 +1,6 @@
 from django.urls import reverse
 from django.test import TestCase
+from django.db import IntegrityError
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
@@ -11,88 +12,121 @@ from admin_api.models import (
     ParentCompany
 )
 from decimal import Decimal
+from unittest.mock import patch
+import json
 
 User = get_user_model()
 
+CUSTOMERS_URL = reverse('admin_api:customers')
+
 class CustomerViewTests(TestCase):
     """Tests for the Customer API views."""
+    
+    # Parent company, two customers and customer 1's address, contact and payment term
+    fixtures = ['customers_baseline.json']
 
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
         # Create a test user
-        self.user = User.objects.create_user(
+        cls.user = User(
             username='testuser',
-            email='test@example.com',
-            password='testpassword'
-        )
-        
-        # Create a parent company with only the fields it actually has
-        self.parent_company = ParentCompany.objects.create(
-            name='Test Parent Company',
-            consolidate_payment_terms=True
-        )
-        
-        # Create test customers
-        self.customer1 = Customer.objects.create(
-            name='Test Customer 1',
-            registered_name='Test Registered 1',
-            tin='987654321',
-            phone_number='987-654-3210',
-            status='active',
-            has_parent=False,
-            company_address='123 Test St',
-            city='Test City',
-            vat_type='VAT'
-        )
-        
-        self.customer2 = Customer.objects.create(
-            name='Test Customer 2',
-            registered_name='Test Registered 2',
-            phone_number='555-555-5555',
-            status='inactive',
-            has_parent=True,
-            parent_company=self.parent_company,
-            company_address='456 Test Ave',
-            city='Another City'
-        )
-        
-        # Create related data for customer1
-        self.address1 = CustomerAddress.objects.create(
-            customer=self.customer1,
-            delivery_address='123 Delivery St',
-            delivery_schedule='Monday-Friday 9-5'
-        )
-        
-        self.contact1 = CustomerContact.objects.create(
-            customer=self.customer1,
-            contact_person='John Doe',
-            position='Manager',
-            department='Sales'
+            email='test@example.com'
         )
+        cls.user.set_unusable_password()
+        cls.user.save()
+        
+        # Look up the baseline customers and related data loaded from the fixture
+        cls.parent_company = ParentCompany.objects.get(name='Test Parent Company')
+        cls.customer1 = Customer.objects.get(name='Test Customer 1')
+        cls.customer2 = Customer.objects.get(name='Test Customer 2')
+        cls.address1 = CustomerAddress.objects.get(customer=cls.customer1)
+        cls.contact1 = CustomerContact.objects.get(customer=cls.customer1)
+        cls.payment_term1 = CustomerPaymentTerm.objects.get(customer=cls.customer1)
+        
+        # Request bodies for the related-data tests, serialized once
+        cls.complete_customer_payload = json.dumps({
+            'name': 'Complete Customer',
+            'registered_name': 'Complete Registered',
+            'phone_number': '123-123-1234',
+            'company_address': 'Complete Address',
+            'city': 'Complete City',
+            'addresses': [
+                {
+                    'delivery_address': 'Delivery Address 1',
+                    'delivery_schedule': 'Monday-Wednesday'
+                },
+                {
+                    'delivery_address': 'Delivery Address 2',
+                    'delivery_schedule': 'Thursday-Friday'
+                }
+            ],
+            'contacts': [
+                {
+                    'contact_person': 'Jane Smith',
+                    'position': 'CEO',
+                    'department': 'Executive',
+                    'email': 'jane@example.com',
+                    'mobile_number': '555-123-4567',
+                    'office_number': '555-987-6543'
+                }
+            ],
+            'payment_term': {
+                'name': 'Premium Terms',
+                'credit_limit': 100000,
+                'stock_payment_terms': '60 days',
+                'stock_dp_percentage': 10,
+                'stock_terms_days': 60,
+                'import_payment_terms': '90 days',
+                'import_dp_percentage': 15,
+                'import_terms_days': 90
+            }
+        }).encode()
         
-        self.payment_term1 = CustomerPaymentTerm.objects.create(
-            customer=self.customer1,
-            name='Standard Terms',
-            credit_limit=Decimal('50000.00'),
-            stock_payment_terms='30 days',
-            stock_dp_percentage=Decimal('20.00'),
-            stock_terms_days=30,
-            import_payment_terms='45 days',
-            import_dp_percentage=Decimal('30.00'),
-            import_terms_days=45
-        )
+        cls.update_customer_payload = json.dumps({
+            'name': 'Fully Updated Customer',
+            'addresses': [
+                {
+                    'id': cls.address1.id,
+                    'delivery_address': 'Updated Delivery St',
+                    'delivery_schedule': 'Updated Schedule'
+                },
+                {
+                    'delivery_address': 'New Delivery Address',
+                    'delivery_schedule': 'New Schedule'
+                }
+            ],
+            'contacts': [
+                {
+                    'contact_person': 'New Contact',
+                    'position': 'New Position',
+                    'department': 'New Department'
+                }
+            ],
+            'payment_term': {
+                'name': 'Updated Terms',
+                'credit_limit': 75000,
+                'stock_payment_terms': 'Updated stock terms',
+                'stock_dp_percentage': 25,
+                'stock_terms_days': 45,
+                'import_payment_terms': 'Updated import terms',
+                'import_dp_percentage': 35,
+                'import_terms_days': 60
+            }
+        }).encode()
         
-        # Set up API client
+        # URLs
+        cls.detail_url = reverse('admin_api:customer-detail', args=[cls.customer1.id])
+    
+    def setUp(self):
+        """Set up an authenticated API client."""
         self.client = APIClient()
         self.client.force_authenticate(user=self.user)
-        
-        # URLs
-        self.list_url = reverse('admin_api:customers')
-        self.detail_url = reverse('admin_api:customer-detail', args=[self.customer1.id])
     
     def test_get_customer_list(self):
         """Test retrieving a list of customers."""
-        response = self.client.get(self.list_url)
+        with self.assertNumQueries(4):
+            response = self.client.get(CUSTOMERS_URL)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
@@ -100,7 +134,8 @@ class CustomerViewTests(TestCase):
     
     def test_get_customer_detail(self):
         """Test retrieving a single customer with all related data."""
-        response = self.client.get(self.detail_url)
+        with self.assertNumQueries(3):
+            response = self.client.get(self.detail_url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
@@ -113,7 +148,8 @@ class CustomerViewTests(TestCase):
     
     def test_search_customers(self):
         """Test searching for customers."""
-        response = self.client.get(f"{self.list_url}?search=Test Customer 1")
+        with self.assertNumQueries(4):
+            response = self.client.get(f"{CUSTOMERS_URL}?search=Test Customer 1")
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
@@ -122,7 +158,7 @@ class CustomerViewTests(TestCase):
     
     def test_filter_by_status(self):
         """Test filtering customers by status."""
-        response = self.client.get(f"{self.list_url}?status=inactive")
+        response = self.client.get(f"{CUSTOMERS_URL}?status=inactive")
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
@@ -131,7 +167,7 @@ class CustomerViewTests(TestCase):
     
     def test_filter_by_parent_company(self):
         """Test filtering customers by parent company."""
-        response = self.client.get(f"{self.list_url}?parent_company_id={self.parent_company.id}")
+        response = self.client.get(f"{CUSTOMERS_URL}?parent_company_id={self.parent_company.id}")
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
@@ -141,7 +177,7 @@ class CustomerViewTests(TestCase):
     def test_sort_customers(self):
         """Test sorting customers."""
         # Sort by name descending
-        response = self.client.get(f"{self.list_url}?sort_by=name&sort_direction=desc")
+        response = self.client.get(f"{CUSTOMERS_URL}?sort_by=name&sort_direction=desc")
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
@@ -158,7 +194,7 @@ class CustomerViewTests(TestCase):
             'city': 'New City'
         }
         
-        response = self.client.post(self.list_url, data, format='json')
+        response = self.client.post(CUSTOMERS_URL, data, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(response.data['success'])
@@ -179,7 +215,7 @@ class CustomerViewTests(TestCase):
             'parent_company': self.parent_company.id
         }
         
-        response = self.client.post(self.list_url, data, format='json')
+        response = self.client.post(CUSTOMERS_URL, data, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(response.data['success'])
@@ -196,7 +232,7 @@ class CustomerViewTests(TestCase):
             'has_parent': True  # Missing parent_company
         }
         
-        response = self.client.post(self.list_url, data, format='json')
+        response = self.client.post(CUSTOMERS_URL, data, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertFalse(response.data['success'])
@@ -210,52 +246,14 @@ class CustomerViewTests(TestCase):
             # Missing registered_name, phone_number, etc.
         }
         
-        response = self.client.post(self.list_url, data, format='json')
+        response = self.client.post(CUSTOMERS_URL, data, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertFalse(response.data['success'])
     
     def test_create_customer_with_related_data(self):
         """Test creating a customer with addresses, contacts, and payment terms."""
-        data = {
-            'name': 'Complete Customer',
-            'registered_name': 'Complete Registered',
-            'phone_number': '123-123-1234',
-            'company_address': 'Complete Address',
-            'city': 'Complete City',
-            'addresses': [
-                {
-                    'delivery_address': 'Delivery Address 1',
-                    'delivery_schedule': 'Monday-Wednesday'
-                },
-                {
-                    'delivery_address': 'Delivery Address 2',
-                    'delivery_schedule': 'Thursday-Friday'
-                }
-            ],
-            'contacts': [
-                {
-                    'contact_person': 'Jane Smith',
-                    'position': 'CEO',
-                    'department': 'Executive',
-                    'email': 'jane@example.com',
-                    'mobile_number': '555-123-4567',
-                    'office_number': '555-987-6543'
-                }
-            ],
-            'payment_term': {
-                'name': 'Premium Terms',
-                'credit_limit': 100000,
-                'stock_payment_terms': '60 days',
-                'stock_dp_percentage': 10,
-                'stock_terms_days': 60,
-                'import_payment_terms': '90 days',
-                'import_dp_percentage': 15,
-                'import_terms_days': 90
-            }
-        }
-        
-        response = self.client.post(self.list_url, data, format='json')
+        response = self.client.post(CUSTOMERS_URL, data=self.complete_customer_payload, content_type='application/json')
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(response.data['success'])
@@ -268,6 +266,19 @@ class CustomerViewTests(TestCase):
         self.assertEqual(customer.contacts.count(), 1)
         self.assertIsNotNone(hasattr(customer, 'payment_term'))
     
+    def test_create_customer_rolls_back_on_related_data_error(self):
+        """Test that a failure saving related data leaves no partial customer behind."""
+        with patch('admin_api.serializers.CustomerPaymentTerm.objects.create', side_effect=IntegrityError('payment term failed')):
+            response = self.client.post(CUSTOMERS_URL, data=self.complete_customer_payload, content_type='application/json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.data['success'])
+        
+        # The customer and the addresses/contacts saved before the failure are rolled back
+        self.assertFalse(Customer.objects.filter(name='Complete Customer').exists())
+        self.assertEqual(CustomerAddress.objects.count(), 1)
+        self.assertEqual(CustomerContact.objects.count(), 1)
+    
     def test_update_customer(self):
         """Test updating a customer."""
         data = {
@@ -287,60 +298,26 @@ class CustomerViewTests(TestCase):
     
     def test_update_customer_with_related_data(self):
         """Test updating a customer with related data."""
-        data = {
-            'name': 'Fully Updated Customer',
-            'addresses': [
-                {
-                    'id': self.address1.id,
-                    'delivery_address': 'Updated Delivery St',
-                    'delivery_schedule': 'Updated Schedule'
-                },
-                {
-                    'delivery_address': 'New Delivery Address',
-                    'delivery_schedule': 'New Schedule'
-                }
-            ],
-            'contacts': [
-                {
-                    'contact_person': 'New Contact',
-                    'position': 'New Position',
-                    'department': 'New Department'
-                }
-            ],
-            'payment_term': {
-                'name': 'Updated Terms',
-                'credit_limit': 75000,
-                'stock_payment_terms': 'Updated stock terms',
-                'stock_dp_percentage': 25,
-                'stock_terms_days': 45,
-                'import_payment_terms': 'Updated import terms',
-                'import_dp_percentage': 35,
-                'import_terms_days': 60
-            }
-        }
-        
-        response = self.client.put(self.detail_url, data, format='json')
+        response = self.client.put(self.detail_url, data=self.update_customer_payload, content_type='application/json')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
         
-        # Check that the related data was updated
-        self.customer1.refresh_from_db()
+        # Check that the related data was updated, using the customer returned by the API
+        data = response.data['data']
         
         # Should have 2 addresses now (1 updated, 1 new)
-        self.assertEqual(self.customer1.addresses.count(), 2)
-        updated_address = self.customer1.addresses.get(id=self.address1.id)
-        self.assertEqual(updated_address.delivery_address, 'Updated Delivery St')
+        self.assertEqual(len(data['addresses']), 2)
+        addresses_by_id = {address['id']: address for address in data['addresses']}
+        self.assertEqual(addresses_by_id[self.address1.id]['delivery_address'], 'Updated Delivery St')
         
         # Should have 1 contact (old one deleted, new one added)
-        self.assertEqual(self.customer1.contacts.count(), 1)
-        new_contact = self.customer1.contacts.first()
-        self.assertEqual(new_contact.contact_person, 'New Contact')
+        self.assertEqual(len(data['contacts']), 1)
+        self.assertEqual(data['contacts'][0]['contact_person'], 'New Contact')
         
         # Payment term should be updated
-        self.customer1.payment_term.refresh_from_db()
-        self.assertEqual(self.customer1.payment_term.name, 'Updated Terms')
-        self.assertEqual(self.customer1.payment_term.credit_limit, Decimal('75000.00'))
+        self.assertEqual(data['payment_term']['name'], 'Updated Terms')
+        self.assertEqual(Decimal(data['payment_term']['credit_limit']), Decimal('75000.00'))
     
     def test_delete_customer(self):
         """Test deleting a customer."""
@@ -364,17 +341,17 @@ class CustomerViewTests(TestCase):
         # Create a client without authentication
         client = APIClient()
         
-        response = client.get(self.list_url)
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-        
-        response = client.get(self.detail_url)
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-        
-        response = client.post(self.list_url, {})
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-        
-        response = client.put(self.detail_url, {})
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-        
-        response = client.delete(self.detail_url)
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
+        requests = [
+            ('get', CUSTOMERS_URL, None),
+            ('get', self.detail_url, None),
+            ('post', CUSTOMERS_URL, {}),
+            ('put', self.detail_url, {}),
+            ('delete', self.detail_url, None),
+        ]
+        for method, url, data in requests:
+            with self.subTest(method=method, url=url):
+                if data is None:
+                    response = getattr(client, method)(url)
+                else:
+                    response = getattr(client, method)(url, data)
+                self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
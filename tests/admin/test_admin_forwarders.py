@@ -1,45 +1,58 @@
 from django.urls import reverse
-from django.test import TestCase
-from rest_framework.test import APIClient
+from rest_framework.test import APIRequestFactory
 from rest_framework import status
-from django.contrib.auth import get_user_model
 from admin_api.models import Forwarder, ForwarderContact
+from admin_api.views import ForwarderView
 
-User = get_user_model()
+from tests.admin.base import AdminAPITestCase
 
-class ForwarderViewTests(TestCase):
+
+FORWARDERS_URL = reverse('admin_api:forwarders')
+
+
+def _forwarder_payload(**overrides):
+    """Return a valid COD forwarder create payload with the given fields changed."""
+    payload = {
+        'company_name': 'New Forwarder',
+        'address': 'New Address',
+        'email': 'new@example.com',
+        'phone_number': '123-123-1234',
+        'payment_type': 'cod'
+    }
+    payload.update(overrides)
+    return payload
+
+
+class ForwarderViewTests(AdminAPITestCase):
     """Tests for the Forwarder API views."""
 
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        # Create a test user
-        self.user = User.objects.create_user(
-            username='testuser',
-            email='test@example.com',
-            password='testpassword'
-        )
-        
-        # Create test forwarders
-        self.forwarder1 = Forwarder.objects.create(
-            company_name='Test Forwarder 1',
-            address='123 Forwarder St',
-            email='forwarder1@example.com',
-            phone_number='123-456-7890',
-            payment_type='cod'
-        )
-        
-        self.forwarder2 = Forwarder.objects.create(
-            company_name='Test Forwarder 2',
-            address='456 Forwarder Ave',
-            email='forwarder2@example.com',
-            phone_number='987-654-3210',
-            payment_type='terms',
-            payment_terms_days=30
-        )
+        super().setUpTestData()
+        
+        # Create test forwarders in a single INSERT
+        cls.forwarder1, cls.forwarder2 = Forwarder.objects.bulk_create([
+            Forwarder(
+                company_name='Test Forwarder 1',
+                address='123 Forwarder St',
+                email='forwarder1@example.com',
+                phone_number='123-456-7890',
+                payment_type='cod'
+            ),
+            Forwarder(
+                company_name='Test Forwarder 2',
+                address='456 Forwarder Ave',
+                email='forwarder2@example.com',
+                phone_number='987-654-3210',
+                payment_type='terms',
+                payment_terms_days=30
+            ),
+        ])
         
         # Create related data for forwarder1
-        self.contact1 = ForwarderContact.objects.create(
-            forwarder=self.forwarder1,
+        cls.contact1 = ForwarderContact.objects.create(
+            forwarder=cls.forwarder1,
             contact_person='John Smith',
             position='Agent',
             department='Logistics',
@@ -48,160 +61,79 @@ class ForwarderViewTests(TestCase):
             personal_number='444-555-6666'
         )
         
-        # Set up API client
-        self.client = APIClient()
-        self.client.force_authenticate(user=self.user)
-        
         # URLs
-        self.list_url = reverse('admin_api:forwarders')
-        self.detail_url = reverse('admin_api:forwarder-detail', args=[self.forwarder1.id])
-    
-    def test_get_forwarder_list(self):
-        """Test retrieving a list of forwarders."""
-        response = self.client.get(self.list_url)
-        
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['success'])
-        self.assertEqual(len(response.data['data']), 2)
+        cls.detail_url = reverse('admin_api:forwarder-detail', args=[cls.forwarder1.id])
     
     def test_get_forwarder_detail(self):
         """Test retrieving a single forwarder with all related data."""
-        response = self.client.get(self.detail_url)
+        # 1 forwarder + 1 prefetch of contacts
+        with self.assertNumQueries(2):
+            response = self.client.get(self.detail_url)
         
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['success'])
+        self.assert_ok(response)
         
         data = response.data['data']
         self.assertEqual(data['company_name'], 'Test Forwarder 1')
         self.assertEqual(len(data['contacts']), 1)
         self.assertEqual(data['payment_type'], 'cod')
     
-    def test_search_forwarders(self):
-        """Test searching for forwarders."""
-        response = self.client.get(f"{self.list_url}?search=Test Forwarder 1")
-        
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['success'])
-        self.assertEqual(len(response.data['data']), 1)
-        self.assertEqual(response.data['data'][0]['company_name'], 'Test Forwarder 1')
-    
-    def test_filter_by_payment_type(self):
-        """Test filtering forwarders by payment type."""
-        response = self.client.get(f"{self.list_url}?payment_type=terms")
-        
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['success'])
-        self.assertEqual(len(response.data['data']), 1)
-        self.assertEqual(response.data['data'][0]['company_name'], 'Test Forwarder 2')
-    
-    def test_sort_forwarders(self):
-        """Test sorting forwarders."""
-        # Sort by company_name descending
-        response = self.client.get(f"{self.list_url}?sort_by=company_name&sort_direction=desc")
-        
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['success'])
-        self.assertEqual(response.data['data'][0]['company_name'], 'Test Forwarder 2')
-        self.assertEqual(response.data['data'][1]['company_name'], 'Test Forwarder 1')
-    
-    def test_create_forwarder_minimal(self):
-        """Test creating a forwarder with minimal data."""
-        data = {
-            'company_name': 'New Forwarder',
-            'address': 'New Address',
-            'email': 'new@example.com',
-            'phone_number': '123-123-1234',
-            'payment_type': 'cod'
-        }
-        
-        response = self.client.post(self.list_url, data, format='json')
-        
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertTrue(response.data['success'])
-        self.assertEqual(response.data['data']['company_name'], 'New Forwarder')
-        
-        # Check that the forwarder was created in the database
-        self.assertEqual(Forwarder.objects.count(), 3)
-    
-    def test_create_forwarder_with_payment_terms(self):
-        """Test creating a forwarder with payment terms."""
-        data = {
-            'company_name': 'Terms Forwarder',
-            'address': 'Terms Address',
-            'email': 'terms@example.com',
-            'phone_number': '123-123-1234',
-            'payment_type': 'terms',
-            'payment_terms_days': 45
-        }
-        
-        response = self.client.post(self.list_url, data, format='json')
-        
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertTrue(response.data['success'])
-        self.assertEqual(response.data['data']['payment_type'], 'terms')
-        self.assertEqual(response.data['data']['payment_terms_days'], 45)
-    
-    def test_create_forwarder_payment_terms_validation(self):
-        """Test validation error when payment_type is 'terms' but no payment_terms_days is provided."""
-        data = {
-            'company_name': 'Invalid Forwarder',
-            'address': 'Invalid Address',
-            'email': 'invalid@example.com',
-            'phone_number': '123-123-1234',
-            'payment_type': 'terms'  # Missing payment_terms_days
-        }
-        
-        response = self.client.post(self.list_url, data, format='json')
-        
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertFalse(response.data['success'])
-        self.assertIn('payment_terms_days', response.data['errors'])
+    def test_create_forwarder(self):
+        """Test creating forwarders with COD and payment-terms payloads."""
+        cases = [
+            ('minimal', _forwarder_payload()),
+            ('payment terms', _forwarder_payload(payment_type='terms', payment_terms_days=45)),
+        ]
+        for name, data in cases:
+            with self.subTest(name):
+                response = self.client.post(FORWARDERS_URL, data, format='json')
+                
+                self.assert_ok(response, status.HTTP_201_CREATED)
+                for field in ('company_name', 'payment_type', 'payment_terms_days'):
+                    self.assertEqual(response.data['data'][field], data.get(field))
+                
+                # Check that the forwarder was created in the database
+                self.assertTrue(Forwarder.objects.filter(id=response.data['data']['id']).exists())
     
-    def test_create_forwarder_validation_error(self):
-        """Test validation error when creating a forwarder."""
-        # Missing required fields
-        data = {
-            'company_name': 'Incomplete Forwarder'
+    def test_create_forwarder_validation_errors(self):
+        """Test validation errors when creating a forwarder."""
+        cases = [
+            # payment_type is 'terms' but no payment_terms_days is provided
+            ('terms without days', _forwarder_payload(payment_type='terms'), 'payment_terms_days'),
             # Missing address, email, phone_number
-        }
-        
-        response = self.client.post(self.list_url, data, format='json')
-        
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertFalse(response.data['success'])
+            ('missing required fields', {'company_name': 'Incomplete Forwarder'}, 'address'),
+        ]
+        for name, data, error_field in cases:
+            with self.subTest(name):
+                response = self.client.post(FORWARDERS_URL, data, format='json')
+                
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertFalse(response.data['success'])
+                self.assertIn(error_field, response.data['errors'])
     
     def test_create_forwarder_with_contacts(self):
         """Test creating a forwarder with contacts."""
-        data = {
-            'company_name': 'Complete Forwarder',
-            'address': 'Complete Address',
-            'email': 'complete@example.com',
-            'phone_number': '123-123-1234',
-            'payment_type': 'cod',
-            'contacts': [
-                {
-                    'contact_person': 'Jane Doe',
-                    'position': 'Manager',
-                    'department': 'Operations',
-                    'email': 'jane@example.com',
-                    'office_number': '111-222-3333',
-                    'personal_number': '444-555-6666'
-                },
-                {
-                    'contact_person': 'Bob Smith',
-                    'position': 'Assistant',
-                    'department': 'Operations',
-                    'email': 'bob@example.com',
-                    'office_number': '777-888-9999',
-                    'personal_number': '000-111-2222'
-                }
-            ]
-        }
-        
-        response = self.client.post(self.list_url, data, format='json')
-        
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertTrue(response.data['success'])
+        data = _forwarder_payload(contacts=[
+            {
+                'contact_person': 'Jane Doe',
+                'position': 'Manager',
+                'department': 'Operations',
+                'email': 'jane@example.com',
+                'office_number': '111-222-3333',
+                'personal_number': '444-555-6666'
+            },
+            {
+                'contact_person': 'Bob Smith',
+                'position': 'Assistant',
+                'department': 'Operations',
+                'email': 'bob@example.com',
+                'office_number': '777-888-9999',
+                'personal_number': '000-111-2222'
+            }
+        ])
+        
+        response = self.client.post(FORWARDERS_URL, data, format='json')
+        
+        self.assert_ok(response, status.HTTP_201_CREATED)
         
         # Check that related data was created
         forwarder_id = response.data['data']['id']
@@ -218,8 +150,7 @@ class ForwarderViewTests(TestCase):
         
         response = self.client.put(self.detail_url, data, format='json')
         
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['success'])
+        self.assert_ok(response)
         
         # Check that the forwarder was updated
         self.forwarder1.refresh_from_db()
@@ -235,8 +166,7 @@ class ForwarderViewTests(TestCase):
         
         response = self.client.put(self.detail_url, data, format='json')
         
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['success'])
+        self.assert_ok(response)
         
         # Check that the payment type was updated
         self.forwarder1.refresh_from_db()
@@ -270,15 +200,15 @@ class ForwarderViewTests(TestCase):
         
         response = self.client.put(self.detail_url, data, format='json')
         
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['success'])
+        self.assert_ok(response)
         
-        # Check that the related data was updated
-        self.forwarder1.refresh_from_db()
+        # Check that the related data was updated, loading the forwarder and its contacts together
+        forwarder = Forwarder.objects.prefetch_related('contacts').get(id=self.forwarder1.id)
+        contacts = list(forwarder.contacts.all())
         
         # Should have 2 contacts now (1 updated, 1 new)
-        self.assertEqual(self.forwarder1.contacts.count(), 2)
-        updated_contact = self.forwarder1.contacts.get(id=self.contact1.id)
+        self.assertEqual(len(contacts), 2)
+        updated_contact = next(contact for contact in contacts if contact.id == self.contact1.id)
         self.assertEqual(updated_contact.contact_person, 'Updated John')
         self.assertEqual(updated_contact.email, 'updated@example.com')
     
@@ -286,33 +216,90 @@ class ForwarderViewTests(TestCase):
         """Test deleting a forwarder."""
         response = self.client.delete(self.detail_url)
         
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['success'])
+        self.assert_ok(response)
         
-        # Check that the forwarder was deleted
-        self.assertEqual(Forwarder.objects.count(), 1)
-        with self.assertRaises(Forwarder.DoesNotExist):
-            Forwarder.objects.get(id=self.forwarder1.id)
+        # Check that only the requested forwarder was deleted
+        self.assertFalse(Forwarder.objects.filter(id=self.forwarder1.id).exists())
+        self.assertTrue(Forwarder.objects.filter(id=self.forwarder2.id).exists())
         
         # Related data should also be deleted (cascade)
-        self.assertEqual(ForwarderContact.objects.filter(forwarder_id=self.forwarder1.id).count(), 0)
+        self.assertFalse(ForwarderContact.objects.filter(forwarder_id=self.forwarder1.id).exists())
     
     def test_unauthorized_access(self):
         """Test that unauthenticated users cannot access the API."""
-        # Create a client without authentication
-        client = APIClient()
-        
-        response = client.get(self.list_url)
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        # Call the view directly with unauthenticated requests
+        factory = APIRequestFactory()
+        view = ForwarderView.as_view()
+        detail_kwargs = {'pk': self.forwarder1.id}
+        
+        requests = [
+            ('get', FORWARDERS_URL, {}, None),
+            ('get', self.detail_url, detail_kwargs, None),
+            ('post', FORWARDERS_URL, {}, {}),
+            ('put', self.detail_url, detail_kwargs, {}),
+            ('delete', self.detail_url, detail_kwargs, None),
+        ]
+        for method, url, kwargs, data in requests:
+            with self.subTest(method=method, url=url):
+                if data is None:
+                    request = getattr(factory, method)(url)
+                else:
+                    request = getattr(factory, method)(url, data, format='json')
+                response = view(request, **kwargs)
+                self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ForwarderListViewTests(AdminAPITestCase):
+    """Tests for listing, searching, filtering and sorting forwarders."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up only the rows the list endpoint needs."""
+        super().setUpTestData()
+        
+        # Create test forwarders without contacts or contact details
+        Forwarder.objects.bulk_create([
+            Forwarder(
+                company_name='Test Forwarder 1',
+                payment_type='cod'
+            ),
+            Forwarder(
+                company_name='Test Forwarder 2',
+                payment_type='terms',
+                payment_terms_days=30
+            ),
+        ])
+    
+    def test_get_forwarder_list(self):
+        """Test retrieving a list of forwarders."""
+        # 1 count + 1 page + 1 prefetch of contacts
+        with self.assertNumQueries(3):
+            response = self.client.get(FORWARDERS_URL)
         
-        response = client.get(self.detail_url)
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assert_ok(response)
+        self.assertEqual(len(response.data['data']), 2)
+    
+    def test_search_forwarders(self):
+        """Test searching for forwarders."""
+        response = self.client.get(f"{FORWARDERS_URL}?search=Test Forwarder 1")
         
-        response = client.post(self.list_url, {})
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assert_ok(response)
+        self.assertEqual(len(response.data['data']), 1)
+        self.assertEqual(response.data['data'][0]['company_name'], 'Test Forwarder 1')
+    
+    def test_filter_by_payment_type(self):
+        """Test filtering forwarders by payment type."""
+        response = self.client.get(f"{FORWARDERS_URL}?payment_type=terms")
         
-        response = client.put(self.detail_url, {})
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assert_ok(response)
+        self.assertEqual(len(response.data['data']), 1)
+        self.assertEqual(response.data['data'][0]['company_name'], 'Test Forwarder 2')
+    
+    def test_sort_forwarders(self):
+        """Test sorting forwarders."""
+        # Sort by company_name descending
+        response = self.client.get(f"{FORWARDERS_URL}?sort_by=company_name&sort_direction=desc")
         
-        response = client.delete(self.detail_url)
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
+        self.assert_ok(response)
+        self.assertEqual(response.data['data'][0]['company_name'], 'Test Forwarder 2')
+        self.assertEqual(response.data['data'][1]['company_name'], 'Test Forwarder 1')
\ No newline at end of file
@@ -1,42 +1,68 @@
-from django.test import TestCase
 from django.urls import reverse
-from rest_framework.test import APIClient
+from rest_framework.test import APIRequestFactory
 from rest_framework import status
 from decimal import Decimal
-from django.contrib.auth import get_user_model
 from admin_api.models import ParentCompany, ParentCompanyPaymentTerm, Customer
+from admin_api.views import ParentCompanyView
 
-User = get_user_model()
+from tests.admin.base import AdminAPITestCase
 
-class ParentCompanyTests(TestCase):
+
+PARENT_COMPANIES_URL = reverse('admin_api:parent-companies')
+
+class ParentCompanyTests(AdminAPITestCase):
     """Test suite for ParentCompany API views"""
 
-    def setUp(self):
-        """Set up test data and authenticate client"""
-        self.client = APIClient()
-        
-        # Create test user and authenticate
-        self.user = User.objects.create_user(
-            username='testuser',
-            email='test@example.com',
-            password='testpassword123'
-        )
-        self.client.force_authenticate(user=self.user)
-        
-        # Create test parent companies
-        self.parent_company1 = ParentCompany.objects.create(
-            name='Test Parent Company 1',
-            consolidate_payment_terms=True
-        )
-        
-        self.parent_company2 = ParentCompany.objects.create(
-            name='Test Parent Company 2',
-            consolidate_payment_terms=False
-        )
+    # Number of customers created for each parent company
+    PARENT_COMPANY1_CUSTOMERS = 2
+    PARENT_COMPANY2_CUSTOMERS = 1
+
+    # Request bodies shared by the create/update tests; requests only serialize them
+    VALID_PARENT_COMPANY_DATA = {
+        'name': 'New Parent Company',
+        'consolidate_payment_terms': True,
+        'payment_term': {
+            'name': 'Premium Terms',
+            'credit_limit': '150000.00',
+            'stock_payment_terms': 'Net 45',
+            'stock_dp_percentage': '10.00',
+            'stock_terms_days': 45,
+            'import_payment_terms': 'LC 90',
+            'import_dp_percentage': '20.00',
+            'import_terms_days': 90
+        }
+    }
+    
+    VALID_UPDATE_DATA = {
+        'name': 'Updated Parent Company',
+        'consolidate_payment_terms': False
+    }
+    
+    INVALID_DATA = {
+        'name': '',  # Empty name should be invalid
+        'consolidate_payment_terms': True
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data shared by every test in the class"""
+        super().setUpTestData()
+        
+        # Create test parent companies in a single INSERT
+        cls.parent_company1, cls.parent_company2 = ParentCompany.objects.bulk_create([
+            ParentCompany(
+                name='Test Parent Company 1',
+                consolidate_payment_terms=True
+            ),
+            ParentCompany(
+                name='Test Parent Company 2',
+                consolidate_payment_terms=False
+            ),
+        ])
         
         # Create payment terms for parent company 1
-        self.payment_term1 = ParentCompanyPaymentTerm.objects.create(
-            parent_company=self.parent_company1,
+        cls.payment_term1 = ParentCompanyPaymentTerm.objects.create(
+            parent_company=cls.parent_company1,
             name='Standard Terms',
             credit_limit=Decimal('100000.00'),
             stock_payment_terms='Net 30',
@@ -47,92 +73,74 @@ class ParentCompanyTests(TestCase):
             import_terms_days=60
         )
         
-        # Create customers associated with parent companies
-        self.customer1 = Customer.objects.create(
-            name='Customer 1',
-            parent_company=self.parent_company1
-        )
-        
-        self.customer2 = Customer.objects.create(
-            name='Customer 2',
-            parent_company=self.parent_company1
-        )
-        
-        self.customer3 = Customer.objects.create(
-            name='Customer 3',
-            parent_company=self.parent_company2
-        )
+        # Create customers associated with parent companies in batched INSERTs
+        customers = [
+            Customer(name=f'Customer {i}', parent_company=cls.parent_company1)
+            for i in range(1, cls.PARENT_COMPANY1_CUSTOMERS + 1)
+        ]
+        customers += [
+            Customer(name=f'Customer {cls.PARENT_COMPANY1_CUSTOMERS + i}', parent_company=cls.parent_company2)
+            for i in range(1, cls.PARENT_COMPANY2_CUSTOMERS + 1)
+        ]
+        Customer.objects.bulk_create(customers, batch_size=500)
         
         # URLs
-        self.list_url = reverse('admin_api:parent-companies')
-        self.detail_url = reverse('admin_api:parent-company-detail', args=[self.parent_company1.id])
-        
-        # Valid data for creating/updating
-        self.valid_parent_company_data = {
-            'name': 'New Parent Company',
-            'consolidate_payment_terms': True,
-            'payment_term': {
-                'name': 'Premium Terms',
-                'credit_limit': '150000.00',
-                'stock_payment_terms': 'Net 45',
-                'stock_dp_percentage': '10.00',
-                'stock_terms_days': 45,
-                'import_payment_terms': 'LC 90',
-                'import_dp_percentage': '20.00',
-                'import_terms_days': 90
-            }
-        }
-        
-        self.valid_update_data = {
-            'name': 'Updated Parent Company',
-            'consolidate_payment_terms': False
-        }
-        
-        self.invalid_data = {
-            'name': '',  # Empty name should be invalid
-            'consolidate_payment_terms': True
-        }
+        cls.detail_url = reverse('admin_api:parent-company-detail', args=[cls.parent_company1.id])
 
     def test_get_parent_companies_list(self):
         """Test retrieving a list of parent companies"""
-        response = self.client.get(self.list_url)
+        # 1 count + 1 page (with payment terms) + 1 prefetch of customers
+        with self.assertNumQueries(3):
+            response = self.client.get(PARENT_COMPANIES_URL)
         
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['success'])
+        self.assert_ok(response)
         self.assertEqual(len(response.data['data']), 2)
         self.assertIn('meta', response.data)
         self.assertIn('pagination', response.data['meta'])
 
     def test_get_parent_company_detail(self):
         """Test retrieving a single parent company with its payment terms and customers"""
-        response = self.client.get(self.detail_url)
+        # 1 parent company (with payment term) + 1 prefetch of customers
+        with self.assertNumQueries(2):
+            response = self.client.get(self.detail_url)
         
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['success'])
+        self.assert_ok(response)
         self.assertEqual(response.data['data']['name'], 'Test Parent Company 1')
         self.assertTrue(response.data['data']['consolidate_payment_terms'])
         
         # Check payment term data
         self.assertIsNotNone(response.data['data']['payment_term'])
         self.assertEqual(response.data['data']['payment_term']['name'], 'Standard Terms')
-        self.assertEqual(Decimal(response.data['data']['payment_term']['credit_limit']), Decimal('100000.00'))
+        self.assertEqual(response.data['data']['payment_term']['credit_limit'], '100000.00')
         
         # Check customers data
-        self.assertEqual(len(response.data['data']['customers']), 2)
+        self.assertEqual(len(response.data['data']['customers']), self.PARENT_COMPANY1_CUSTOMERS)
         customer_names = [c['name'] for c in response.data['data']['customers']]
         self.assertIn('Customer 1', customer_names)
         self.assertIn('Customer 2', customer_names)
 
+    def test_get_parent_company_detail_query_count_with_many_customers(self):
+        """Test that the detail query count does not grow with the number of customers"""
+        Customer.objects.bulk_create([
+            Customer(name=f'Extra Customer {i}', parent_company=self.parent_company1)
+            for i in range(100)
+        ], batch_size=500)
+        
+        with self.assertNumQueries(2):
+            response = self.client.get(self.detail_url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['data']['customers']), self.PARENT_COMPANY1_CUSTOMERS + 100)
+
     def test_create_parent_company_with_payment_term(self):
         """Test creating a new parent company with payment terms"""
         response = self.client.post(
-            self.list_url,
-            self.valid_parent_company_data,
+            PARENT_COMPANIES_URL,
+            self.VALID_PARENT_COMPANY_DATA,
             format='json'
         )
         
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertTrue(response.data['success'])
+        self.assert_ok(response, status.HTTP_201_CREATED)
         
         # Verify parent company was created
         parent_company = ParentCompany.objects.get(name='New Parent Company')
@@ -152,13 +160,12 @@ class ParentCompanyTests(TestCase):
         }
         
         response = self.client.post(
-            self.list_url,
+            PARENT_COMPANIES_URL,
             data,
             format='json'
         )
         
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertTrue(response.data['success'])
+        self.assert_ok(response, status.HTTP_201_CREATED)
         
         # Verify parent company was created
         parent_company = ParentCompany.objects.get(name='Parent Company No Terms')
@@ -171,8 +178,8 @@ class ParentCompanyTests(TestCase):
     def test_create_parent_company_invalid_data(self):
         """Test creating a parent company with invalid data"""
         response = self.client.post(
-            self.list_url,
-            self.invalid_data,
+            PARENT_COMPANIES_URL,
+            self.INVALID_DATA,
             format='json'
         )
         
@@ -185,12 +192,11 @@ class ParentCompanyTests(TestCase):
         """Test updating a parent company"""
         response = self.client.put(
             self.detail_url,
-            self.valid_update_data,
+            self.VALID_UPDATE_DATA,
             format='json'
         )
         
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['success'])
+        self.assert_ok(response)
         
         # Verify parent company was updated
         self.parent_company1.refresh_from_db()
@@ -219,19 +225,18 @@ class ParentCompanyTests(TestCase):
             format='json'
         )
         
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['success'])
+        self.assert_ok(response)
         
-        # Verify parent company was updated
-        self.parent_company1.refresh_from_db()
-        self.assertEqual(self.parent_company1.name, 'Updated With Terms')
-        
-        # Verify payment term was updated
-        self.payment_term1.refresh_from_db()
-        self.assertEqual(self.payment_term1.name, 'Updated Terms')
-        self.assertEqual(self.payment_term1.credit_limit, Decimal('200000.00'))
-        self.assertEqual(self.payment_term1.stock_terms_days, 60)
-        self.assertEqual(self.payment_term1.import_terms_days, 120)
+        # Verify parent company and payment term were updated, fetching both in one query
+        parent_company = ParentCompany.objects.select_related('payment_term').get(id=self.parent_company1.id)
+        self.assertEqual(parent_company.name, 'Updated With Terms')
+        
+        payment_term = parent_company.payment_term
+        self.assertEqual(payment_term.id, self.payment_term1.id)
+        self.assertEqual(payment_term.name, 'Updated Terms')
+        self.assertEqual(payment_term.credit_limit, Decimal('200000.00'))
+        self.assertEqual(payment_term.stock_terms_days, 60)
+        self.assertEqual(payment_term.import_terms_days, 120)
 
     def test_add_payment_term_to_existing_parent_company(self):
         """Test adding payment terms to a parent company that didn't have them"""
@@ -257,8 +262,7 @@ class ParentCompanyTests(TestCase):
             format='json'
         )
         
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['success'])
+        self.assert_ok(response)
         
         # Verify new payment term was created
         payment_term = ParentCompanyPaymentTerm.objects.get(parent_company=self.parent_company1)
@@ -269,8 +273,7 @@ class ParentCompanyTests(TestCase):
         """Test deleting a parent company"""
         response = self.client.delete(self.detail_url)
         
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['success'])
+        self.assert_ok(response)
         
         # Verify parent company was deleted
         with self.assertRaises(ParentCompany.DoesNotExist):
@@ -282,44 +285,45 @@ class ParentCompanyTests(TestCase):
 
     def test_search_parent_companies(self):
         """Test searching parent companies by name"""
-        response = self.client.get(f"{self.list_url}?search=Company 1")
+        response = self.client.get(f"{PARENT_COMPANIES_URL}?search=Company 1")
         
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['success'])
+        self.assert_ok(response)
         self.assertEqual(len(response.data['data']), 1)
         self.assertEqual(response.data['data'][0]['name'], 'Test Parent Company 1')
 
     def test_sort_parent_companies(self):
         """Test sorting parent companies"""
         # Test ascending sort (default)
-        response = self.client.get(f"{self.list_url}?sort_by=name&sort_direction=asc")
+        response = self.client.get(f"{PARENT_COMPANIES_URL}?sort_by=name&sort_direction=asc")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['data'][0]['name'], 'Test Parent Company 1')
         self.assertEqual(response.data['data'][1]['name'], 'Test Parent Company 2')
         
         # Test descending sort
-        response = self.client.get(f"{self.list_url}?sort_by=name&sort_direction=desc")
+        response = self.client.get(f"{PARENT_COMPANIES_URL}?sort_by=name&sort_direction=desc")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['data'][0]['name'], 'Test Parent Company 2')
         self.assertEqual(response.data['data'][1]['name'], 'Test Parent Company 1')
 
     def test_unauthorized_access(self):
         """Test that unauthenticated users cannot access the API"""
-        # Create a new client without authentication
-        unauthenticated_client = APIClient()
-        
-        # Try to access the list endpoint
-        response = unauthenticated_client.get(self.list_url)
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-        
-        # Try to access the detail endpoint
-        response = unauthenticated_client.get(self.detail_url)
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-        
-        # Try to create a parent company
-        response = unauthenticated_client.post(
-            self.list_url,
-            self.valid_parent_company_data,
-            format='json'
-        )
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED) 
\ No newline at end of file
+        # Call the view directly with unauthenticated requests
+        factory = APIRequestFactory()
+        view = ParentCompanyView.as_view()
+        detail_kwargs = {'pk': self.parent_company1.id}
+        
+        requests = [
+            ('get', PARENT_COMPANIES_URL, {}, None),
+            ('get', self.detail_url, detail_kwargs, None),
+            ('post', PARENT_COMPANIES_URL, {}, self.VALID_PARENT_COMPANY_DATA),
+            ('put', self.detail_url, detail_kwargs, self.VALID_UPDATE_DATA),
+            ('delete', self.detail_url, detail_kwargs, None),
+        ]
+        for method, url, kwargs, data in requests:
+            with self.subTest(method=method, url=url):
+                if data is None:
+                    request = getattr(factory, method)(url)
+                else:
+                    request = getattr(factory, method)(url, data, format='json')
+                response = view(request, **kwargs)
+                self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
@@ -1,130 +1,99 @@
-from django.test import TestCase
 from django.urls import reverse
-from rest_framework.test import APIClient
+from django.contrib.auth.hashers import make_password
+from rest_framework.test import APISimpleTestCase
 from rest_framework import status
 from admin_api.models import CustomUser
+from tests.admin.base import AdminAPITestCase
 
-class SidebarTests(TestCase):
-    def setUp(self):
-        # Create admin user
-        self.admin_user = CustomUser.objects.create_user(
-            username='admin_user',
-            email='admin@example.com',
-            password='password123',
-            first_name='Admin',
-            last_name='User',
-            role='admin',
-            user_access=['inventory', 'quotations'],
-            admin_access=['users', 'inventory']
-        )
-        
-        # Create regular user
-        self.regular_user = CustomUser.objects.create_user(
-            username='regular_user',
-            email='user@example.com',
-            password='password123',
-            first_name='Regular',
-            last_name='User',
-            role='user',
-            user_access=['inventory']
-        )
-        
-        # Create supervisor user with admin access
-        self.supervisor_user = CustomUser.objects.create_user(
-            username='supervisor_user',
-            email='supervisor@example.com',
-            password='password123',
-            first_name='Supervisor',
-            last_name='User',
-            role='supervisor',
-            user_access=['inventory', 'warehouse'],
-            admin_access=['inventory', 'warehouses']
-        )
-        
-        # Create supervisor user without admin access
-        self.supervisor_no_admin = CustomUser.objects.create_user(
-            username='supervisor_no_admin',
-            email='supervisor2@example.com',
-            password='password123',
-            first_name='Supervisor',
-            last_name='NoAdmin',
-            role='supervisor',
-            user_access=['inventory', 'warehouse']
-        )
-        
-        self.client = APIClient()
-        self.url = reverse('admin_api:sidebar')
+SIDEBAR_URL = reverse('admin_api:sidebar')
 
-    def test_sidebar_admin_user(self):
-        """Test that admin users can access the sidebar data with admin_access field"""
-        self.client.force_authenticate(user=self.admin_user)
-        response = self.client.get(self.url)
-        
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['success'])
-        
-        # Check user data
-        user_data = response.data['data']
-        self.assertEqual(user_data['id'], self.admin_user.id)
-        self.assertEqual(user_data['first_name'], 'Admin')
-        self.assertEqual(user_data['last_name'], 'User')
-        self.assertEqual(user_data['role'], 'admin')
-        self.assertEqual(set(user_data['user_access']), set(['inventory', 'quotations']))
-        self.assertEqual(set(user_data['admin_access']), set(['users', 'inventory']))
+class SidebarTests(AdminAPITestCase):
+    # The shared test user doubles as the admin user
+    user_fields = {
+        'first_name': 'Admin',
+        'last_name': 'User',
+        'role': 'admin',
+        'user_access': ['inventory', 'quotations'],
+        'admin_access': ['users', 'inventory'],
+    }
 
-    def test_sidebar_regular_user(self):
-        """Test that regular users can access the sidebar data with empty admin_access"""
-        self.client.force_authenticate(user=self.regular_user)
-        response = self.client.get(self.url)
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.admin_user = cls.user
         
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['success'])
-        
-        # Check user data
-        user_data = response.data['data']
-        self.assertEqual(user_data['id'], self.regular_user.id)
-        self.assertEqual(user_data['first_name'], 'Regular')
-        self.assertEqual(user_data['last_name'], 'User')
-        self.assertEqual(user_data['role'], 'user')
-        self.assertEqual(set(user_data['user_access']), set(['inventory']))
-        self.assertEqual(set(user_data['admin_access']), set())
+        # Create the other users in one INSERT; bulk_create skips set_password,
+        # so share one precomputed unusable password
+        unusable_password = make_password(None)
+        (
+            cls.regular_user,
+            cls.supervisor_user,
+            cls.supervisor_no_admin,
+        ) = CustomUser.objects.bulk_create([
+            # Create regular user
+            CustomUser(
+                username='regular_user',
+                email='user@example.com',
+                first_name='Regular',
+                last_name='User',
+                role='user',
+                user_access=['inventory'],
+                password=unusable_password
+            ),
+            # Create supervisor user with admin access
+            CustomUser(
+                username='supervisor_user',
+                email='supervisor@example.com',
+                first_name='Supervisor',
+                last_name='User',
+                role='supervisor',
+                user_access=['inventory', 'warehouse'],
+                admin_access=['inventory', 'warehouses'],
+                password=unusable_password
+            ),
+            # Create supervisor user without admin access
+            CustomUser(
+                username='supervisor_no_admin',
+                email='supervisor2@example.com',
+                first_name='Supervisor',
+                last_name='NoAdmin',
+                role='supervisor',
+                user_access=['inventory', 'warehouse'],
+                password=unusable_password
+            ),
+        ])
 
-    def test_sidebar_supervisor_with_admin_access(self):
-        """Test that supervisors with admin_access can access the sidebar data with admin_access field"""
-        self.client.force_authenticate(user=self.supervisor_user)
-        response = self.client.get(self.url)
-        
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['success'])
-        
-        # Check user data
-        user_data = response.data['data']
-        self.assertEqual(user_data['id'], self.supervisor_user.id)
-        self.assertEqual(user_data['first_name'], 'Supervisor')
-        self.assertEqual(user_data['last_name'], 'User')
-        self.assertEqual(user_data['role'], 'supervisor')
-        self.assertEqual(set(user_data['user_access']), set(['inventory', 'warehouse']))
-        self.assertEqual(set(user_data['admin_access']), set(['inventory', 'warehouses']))
+    def test_sidebar_authenticated(self):
+        """Test that each kind of user gets their own sidebar data, with admin_access only where granted"""
+        cases = [
+            # (user, first_name, last_name, role, user_access, admin_access)
+            (self.admin_user, 'Admin', 'User', 'admin', {'inventory', 'quotations'}, {'users', 'inventory'}),
+            (self.regular_user, 'Regular', 'User', 'user', {'inventory'}, set()),
+            (self.supervisor_user, 'Supervisor', 'User', 'supervisor', {'inventory', 'warehouse'}, {'inventory', 'warehouses'}),
+            (self.supervisor_no_admin, 'Supervisor', 'NoAdmin', 'supervisor', {'inventory', 'warehouse'}, set()),
+        ]
+        for user, first_name, last_name, role, user_access, admin_access in cases:
+            with self.subTest(user=user.username):
+                self.client.force_authenticate(user=user)
+                # The sidebar renders request.user, so it needs no queries
+                with self.assertNumQueries(0):
+                    response = self.client.get(SIDEBAR_URL)
+                
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertTrue(response.data['success'])
+                
+                # Check user data; the access lists are compared as sets
+                user_data = response.data['data']
+                expected = {'id': user.id, 'first_name': first_name, 'last_name': last_name, 'role': role}
+                self.assertEqual({key: user_data[key] for key in expected}, expected)
+                self.assertEqual(set(user_data['user_access']), user_access)
+                self.assertEqual(set(user_data['admin_access']), admin_access)
 
-    def test_sidebar_supervisor_without_admin_access(self):
-        """Test that supervisors without admin_access can access the sidebar data with empty admin_access"""
-        self.client.force_authenticate(user=self.supervisor_no_admin)
-        response = self.client.get(self.url)
-        
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data['success'])
-        
-        # Check user data
-        user_data = response.data['data']
-        self.assertEqual(user_data['id'], self.supervisor_no_admin.id)
-        self.assertEqual(user_data['first_name'], 'Supervisor')
-        self.assertEqual(user_data['last_name'], 'NoAdmin')
-        self.assertEqual(user_data['role'], 'supervisor')
-        self.assertEqual(set(user_data['user_access']), set(['inventory', 'warehouse']))
-        self.assertEqual(set(user_data['admin_access']), set())
+class SidebarUnauthenticatedTests(APISimpleTestCase):
+    """Sidebar checks that never reach the database."""
 
     def test_sidebar_unauthenticated(self):
         """Test that unauthenticated users cannot access the sidebar data"""
-        response = self.client.get(self.url)
+        response = self.client.get(SIDEBAR_URL)
         
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
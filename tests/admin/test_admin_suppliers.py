@@ -1,56 +1,51 @@
-from django.test import TestCase
 from django.urls import reverse
-from rest_framework.test import APIClient
+from rest_framework.test import APISimpleTestCase
 from rest_framework import status
-from django.contrib.auth import get_user_model
 from admin_api.models import Supplier, SupplierAddress, SupplierContact, SupplierPaymentTerm, SupplierBank
-import json
+from tests.admin.base import AdminAPITestCase
 
-User = get_user_model()
+SUPPLIERS_URL = reverse('admin_api:suppliers')
 
-class SupplierViewTests(TestCase):
+class SupplierViewTests(AdminAPITestCase):
     """Test suite for Supplier API views."""
 
-    def setUp(self):
-        """Set up test data."""
-        # Create test user
-        self.user = User.objects.create_user(
-            username='testuser',
-            password='testpassword123',
-            is_staff=True
-        )
-        
-        # Create test suppliers
-        self.supplier1 = Supplier.objects.create(
-            name='Test Supplier 1',
-            supplier_type='local',
-            currency='USD',
-            phone_number='123-456-7890',
-            email='supplier1@example.com',
-            delivery_terms='FOB',
-            remarks='Test remarks'
-        )
-        
-        self.supplier2 = Supplier.objects.create(
-            name='Test Supplier 2',
-            supplier_type='foreign',
-            currency='EURO',
-            phone_number='987-654-3210',
-            email='supplier2@example.com',
-            delivery_terms='CIF',
-            remarks='Another test remarks'
-        )
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data shared by every test in the class."""
+        super().setUpTestData()
+        
+        # Create test suppliers in a single INSERT
+        cls.supplier1, cls.supplier2 = Supplier.objects.bulk_create([
+            Supplier(
+                name='Test Supplier 1',
+                supplier_type='local',
+                currency='USD',
+                phone_number='123-456-7890',
+                email='supplier1@example.com',
+                delivery_terms='FOB',
+                remarks='Test remarks'
+            ),
+            Supplier(
+                name='Test Supplier 2',
+                supplier_type='foreign',
+                currency='EURO',
+                phone_number='987-654-3210',
+                email='supplier2@example.com',
+                delivery_terms='CIF',
+                remarks='Another test remarks'
+            ),
+        ])
         
         # Create address for supplier1
-        self.address1 = SupplierAddress.objects.create(
-            supplier=self.supplier1,
+        cls.address1 = SupplierAddress.objects.create(
+            supplier=cls.supplier1,
             description='Headquarters',
             address='123 Test Street, Test City, Test Country'
         )
         
         # Create contact for supplier1 - updated to match current model
-        self.contact1 = SupplierContact.objects.create(
-            supplier=self.supplier1,
+        cls.contact1 = SupplierContact.objects.create(
+            supplier=cls.supplier1,
             contact_person='John Doe',
             position='Sales Manager',
             department='Sales',
@@ -60,8 +55,8 @@ class SupplierViewTests(TestCase):
         )
         
         # Create bank for supplier1
-        self.bank1 = SupplierBank.objects.create(
-            supplier=self.supplier1,
+        cls.bank1 = SupplierBank.objects.create(
+            supplier=cls.supplier1,
             bank_name='Test Bank',
             bank_address='456 Bank Street, Bank City, Bank Country',
             account_number='123456789',
@@ -75,8 +70,8 @@ class SupplierViewTests(TestCase):
         )
         
         # Create payment term for supplier1 with new structure
-        self.payment_term1 = SupplierPaymentTerm.objects.create(
-            supplier=self.supplier1,
+        cls.payment_term1 = SupplierPaymentTerm.objects.create(
+            supplier=cls.supplier1,
             name='Net 30',
             credit_limit=10000.00,
             payment_terms='Net 30',
@@ -84,17 +79,13 @@ class SupplierViewTests(TestCase):
             terms_days=30
         )
         
-        # Set up API client
-        self.client = APIClient()
-        self.client.force_authenticate(user=self.user)
-        
-        # URLs
-        self.list_url = reverse('admin_api:suppliers')
-        self.detail_url = lambda pk: reverse('admin_api:supplier-detail', args=[pk])
+        cls.detail_url = reverse('admin_api:supplier-detail', args=[cls.supplier1.id])
     
     def test_get_suppliers_list(self):
         """Test retrieving a list of suppliers."""
-        response = self.client.get(self.list_url)
+        # 1 count + 1 page (with payment terms) + 1 prefetch each of addresses, contacts and banks
+        with self.assertNumQueries(5):
+            response = self.client.get(SUPPLIERS_URL)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
@@ -102,7 +93,9 @@ class SupplierViewTests(TestCase):
     
     def test_get_supplier_detail(self):
         """Test retrieving a single supplier with all related data."""
-        response = self.client.get(self.detail_url(self.supplier1.id))
+        # 1 supplier (with payment term) + 1 prefetch each of addresses, contacts and banks
+        with self.assertNumQueries(4):
+            response = self.client.get(self.detail_url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
@@ -126,6 +119,32 @@ class SupplierViewTests(TestCase):
         self.assertIsNotNone(data['payment_term'])
         self.assertEqual(data['payment_term']['name'], 'Net 30')
     
+    def test_get_supplier_detail_query_count_with_many_related_rows(self):
+        """Test that the detail query count does not grow with the number of related rows."""
+        SupplierAddress.objects.bulk_create([
+            SupplierAddress(supplier=self.supplier1, description=f'Branch {i}', address=f'{i} Branch Street')
+            for i in range(10)
+        ])
+        SupplierContact.objects.bulk_create([
+            SupplierContact(
+                supplier=self.supplier1,
+                contact_person=f'Contact {i}',
+                position='Sales',
+                department='Sales',
+                mobile_number='123-456-7890',
+                office_number='123-456-7891',
+                email=f'contact{i}@example.com'
+            )
+            for i in range(10)
+        ])
+        
+        with self.assertNumQueries(4):
+            response = self.client.get(self.detail_url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['data']['addresses']), 11)
+        self.assertEqual(len(response.data['data']['contacts']), 11)
+    
     def test_create_supplier(self):
         """Test creating a new supplier with related data."""
         data = {
@@ -139,7 +158,8 @@ class SupplierViewTests(TestCase):
             'addresses': [
                 {
                     'description': 'Main Office',
-                    'address': '456 New Street, New City, New Country'
+                    'address': '456 New Street, New City',
+                    'country': 'New Country'
                 }
             ],
             'contacts': [
@@ -175,11 +195,7 @@ class SupplierViewTests(TestCase):
             }
         }
         
-        response = self.client.post(
-            self.list_url,
-            data=json.dumps(data),
-            content_type='application/json'
-        )
+        response = self.client.post(SUPPLIERS_URL, data, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(response.data['success'])
@@ -190,6 +206,7 @@ class SupplierViewTests(TestCase):
         
         # Verify related objects were created
         self.assertEqual(new_supplier.addresses.count(), 1)
+        self.assertEqual(new_supplier.addresses.get().country, 'New Country')
         self.assertEqual(new_supplier.contacts.count(), 1)
         self.assertEqual(new_supplier.banks.count(), 1)
         self.assertTrue(hasattr(new_supplier, 'payment_term'))
@@ -257,11 +274,7 @@ class SupplierViewTests(TestCase):
             }
         }
         
-        response = self.client.put(
-            self.detail_url(self.supplier1.id),
-            data=json.dumps(data),
-            content_type='application/json'
-        )
+        response = self.client.put(self.detail_url, data, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
@@ -299,7 +312,7 @@ class SupplierViewTests(TestCase):
     
     def test_delete_supplier(self):
         """Test deleting a supplier."""
-        response = self.client.delete(self.detail_url(self.supplier1.id))
+        response = self.client.delete(self.detail_url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
@@ -315,7 +328,7 @@ class SupplierViewTests(TestCase):
     
     def test_search_suppliers(self):
         """Test searching suppliers."""
-        response = self.client.get(f"{self.list_url}?search=Test Supplier 1")
+        response = self.client.get(f"{SUPPLIERS_URL}?search=Test Supplier 1")
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
@@ -324,7 +337,7 @@ class SupplierViewTests(TestCase):
     
     def test_filter_by_supplier_type(self):
         """Test filtering suppliers by type."""
-        response = self.client.get(f"{self.list_url}?supplier_type=foreign")
+        response = self.client.get(f"{SUPPLIERS_URL}?supplier_type=foreign")
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
@@ -334,20 +347,21 @@ class SupplierViewTests(TestCase):
     def test_sort_suppliers(self):
         """Test sorting suppliers."""
         # Sort by name descending
-        response = self.client.get(f"{self.list_url}?sort_by=name&sort_direction=desc")
+        response = self.client.get(f"{SUPPLIERS_URL}?sort_by=name&sort_direction=desc")
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
         self.assertEqual(response.data['data'][0]['name'], 'Test Supplier 2')
         self.assertEqual(response.data['data'][1]['name'], 'Test Supplier 1')
-    
+
+
+class SupplierUnauthenticatedTests(APISimpleTestCase):
+    """Supplier API checks that never reach the database."""
+
     def test_unauthorized_access(self):
         """Test that unauthenticated users cannot access the API."""
-        # Create a new client without authentication
-        client = APIClient()
-        
-        response = client.get(self.list_url)
+        response = self.client.get(SUPPLIERS_URL)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
         
-        response = client.post(self.list_url, {})
+        response = self.client.post(SUPPLIERS_URL, {})
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
@@ -1,59 +1,63 @@
-from django.test import TestCase
 from django.urls import reverse
-from rest_framework.test import APIClient
+from django.contrib.auth.hashers import make_password
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
+from tests.admin.base import AdminAPITestCase
 
 User = get_user_model()
 
-class UserViewTests(TestCase):
-    def setUp(self):
-        self.client = APIClient()
-        self.users_url = reverse('admin_api:users')
-        
-        # Create admin user
-        self.admin_user = User.objects.create_user(
-            username='adminuser',
-            password='adminpassword123',
-            first_name='Admin',
-            last_name='User',
-            role='admin',
-            status='active',
-            user_access=['admin'],
-            admin_access=['users', 'inventory']
-        )
-        
-        # Create regular users
-        self.user1 = User.objects.create_user(
-            username='user1',
-            password='password123',
-            first_name='User',
-            last_name='One',
-            role='user',
-            status='active',
-            user_access=['inventory'],
-            admin_access=[]
-        )
-        
-        # Create supervisor user with admin access
-        self.user2 = User.objects.create_user(
-            username='user2',
-            password='password123',
-            first_name='User',
-            last_name='Two',
-            role='supervisor',
-            status='active',
-            user_access=['delivery'],
-            admin_access=['warehouses', 'inventory']
-        )
+USERS_URL = reverse('admin_api:users')
+
+class UserViewTests(AdminAPITestCase):
+    # The shared test user is the admin every test authenticates as
+    user_fields = {
+        'first_name': 'Admin',
+        'last_name': 'User',
+        'role': 'admin',
+        'status': 'active',
+        'user_access': ['admin'],
+        'admin_access': ['users', 'inventory'],
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.admin_user = cls.user
         
-        # Authenticate as admin
-        self.admin_token = RefreshToken.for_user(self.admin_user).access_token
-        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.admin_token}')
+        # Create the other users in one INSERT; bulk_create skips set_password,
+        # so share one precomputed unusable password
+        unusable_password = make_password(None)
+        cls.user1, cls.user2 = User.objects.bulk_create([
+            # Create regular users
+            User(
+                username='user1',
+                first_name='User',
+                last_name='One',
+                role='user',
+                status='active',
+                user_access=['inventory'],
+                admin_access=[],
+                password=unusable_password
+            ),
+            # Create supervisor user with admin access
+            User(
+                username='user2',
+                first_name='User',
+                last_name='Two',
+                role='supervisor',
+                status='active',
+                user_access=['delivery'],
+                admin_access=['warehouses', 'inventory'],
+                password=unusable_password
+            ),
+        ])
         
         # User detail URL
-        self.user_detail_url = reverse('admin_api:user-detail', args=[self.user1.id])
+        cls.user_detail_url = reverse('admin_api:user-detail', args=[cls.user1.id])
+    
+    def setUp(self):
+        super().setUp()
         
         # New user data for creation tests
         self.new_user_data = {
@@ -79,7 +83,9 @@ class UserViewTests(TestCase):
 
     def test_get_users_list(self):
         """Test retrieving list of users"""
-        response = self.client.get(self.users_url)
+        # 1 count + 1 page
+        with self.assertNumQueries(2):
+            response = self.client.get(USERS_URL)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
         self.assertEqual(len(response.data['data']), 3)  # 3 users total
@@ -90,7 +96,7 @@ class UserViewTests(TestCase):
 
     def test_get_users_with_search(self):
         """Test retrieving users with search parameter"""
-        response = self.client.get(f"{self.users_url}?search=One")
+        response = self.client.get(f"{USERS_URL}?search=One")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
         self.assertEqual(len(response.data['data']), 1)
@@ -98,7 +104,7 @@ class UserViewTests(TestCase):
 
     def test_get_users_with_sorting(self):
         """Test retrieving users with sorting parameters"""
-        response = self.client.get(f"{self.users_url}?sort_by=username&sort_direction=desc")
+        response = self.client.get(f"{USERS_URL}?sort_by=username&sort_direction=desc")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
         # First user should be 'user2' when sorted by username in descending order
@@ -126,7 +132,7 @@ class UserViewTests(TestCase):
 
     def test_create_user(self):
         """Test creating a new user with admin_access"""
-        response = self.client.post(self.users_url, self.new_user_data, format='json')
+        response = self.client.post(USERS_URL, self.new_user_data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(response.data['success'])
         self.assertEqual(response.data['data']['username'], 'newuser')
@@ -144,7 +150,7 @@ class UserViewTests(TestCase):
             'password': 'short',  # Short password
             'admin_access': ['invalid_section']  # Invalid admin access
         }
-        response = self.client.post(self.users_url, invalid_data, format='json')
+        response = self.client.post(USERS_URL, invalid_data, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertFalse(response.data['success'])
         self.assertIn('errors', response.data)
@@ -204,8 +210,17 @@ class UserViewTests(TestCase):
         with self.assertRaises(User.DoesNotExist):
             User.objects.get(id=self.user1.id)
 
+    def test_jwt_authentication(self):
+        """Test that a signed access token authenticates the request"""
+        self.client.force_authenticate(user=None)
+        access_token = RefreshToken.for_user(self.admin_user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+        response = self.client.get(USERS_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['success'])
+
     def test_unauthenticated_access(self):
         """Test accessing user endpoints without authentication"""
-        self.client.credentials()  # Remove authentication
-        response = self.client.get(self.users_url)
+        self.client.force_authenticate(user=None)  # Remove authentication
+        response = self.client.get(USERS_URL)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
@@ -1,68 +1,78 @@
 from django.urls import reverse
-from django.contrib.auth import get_user_model
-from rest_framework.test import APITestCase
+from rest_framework.test import APIRequestFactory, APISimpleTestCase, force_authenticate
 from rest_framework import status
-import json
 
 from admin_api.models import Warehouse, Shelf
+from admin_api.views import WarehouseView
+from tests.admin.base import AdminAPITestCase
 
-User = get_user_model()
+WAREHOUSES_URL = reverse('admin_api:warehouses')
 
-class WarehouseTests(APITestCase):
+class WarehouseTestCase(AdminAPITestCase):
     """
-    Test suite for Warehouse API endpoints
+    Warehouse and shelf fixtures shared by the warehouse test suites
     """
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """
-        Set up test data and authenticate
+        Set up test data shared by every test in the class
         """
-        # Create test user and authenticate
-        self.user = User.objects.create_user(
-            username='testuser',
-            email='test@example.com',
-            password='testpassword123',
-            is_staff=True
-        )
-        self.client.force_authenticate(user=self.user)
-        
-        # Create test warehouses
-        self.warehouse1 = Warehouse.objects.create(
-            name='Downtown Warehouse',
-            address='123 Main St',
-            city='New York'
-        )
-        
-        self.warehouse2 = Warehouse.objects.create(
-            name='Uptown Storage',
-            address='456 Broadway',
-            city='Chicago'
-        )
-        
-        # Create shelves for warehouse1
-        self.shelf1 = Shelf.objects.create(
-            warehouse=self.warehouse1,
-            aisle='A',
-            shelf='1',
-            info='Electronics'
-        )
-        
-        self.shelf2 = Shelf.objects.create(
-            warehouse=self.warehouse1,
-            aisle='B',
-            shelf='2',
-            info='Clothing'
-        )
-        
-        # URLs
-        self.warehouses_url = reverse('admin_api:warehouses')
-        self.warehouse_detail_url = lambda pk: reverse('admin_api:warehouse-detail', kwargs={'pk': pk})
+        super().setUpTestData()
+        
+        # Create test warehouses in a single INSERT
+        cls.warehouse1, cls.warehouse2 = Warehouse.objects.bulk_create([
+            Warehouse(
+                name='Downtown Warehouse',
+                address='123 Main St',
+                city='New York'
+            ),
+            Warehouse(
+                name='Uptown Storage',
+                address='456 Broadway',
+                city='Chicago'
+            ),
+        ])
+        
+        # Create shelves for warehouse1 in a single INSERT
+        cls.shelf1, cls.shelf2 = Shelf.objects.bulk_create([
+            Shelf(
+                warehouse=cls.warehouse1,
+                aisle='A',
+                shelf='1',
+                info='Electronics'
+            ),
+            Shelf(
+                warehouse=cls.warehouse1,
+                aisle='B',
+                shelf='2',
+                info='Clothing'
+            ),
+        ])
+        
+        cls.detail_url = reverse('admin_api:warehouse-detail', kwargs={'pk': cls.warehouse1.id})
+
+
+class WarehouseReadTests(WarehouseTestCase):
+    """
+    Tests for listing, searching, sorting and retrieving warehouses
+    """
+    
+    def get_list_view(self, params):
+        """
+        Call WarehouseView directly, skipping middleware and URL routing
+        """
+        request = APIRequestFactory().get(WAREHOUSES_URL, params)
+        force_authenticate(request, user=self.user)
+        return WarehouseView.as_view()(request)
     
     def test_get_warehouses_list(self):
         """
         Test retrieving a list of all warehouses
         """
-        response = self.client.get(self.warehouses_url)
+        # 1 count + 1 page + 1 prefetch of shelves
+        with self.assertNumQueries(3):
+            response = self.client.get(WAREHOUSES_URL)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
@@ -74,131 +84,205 @@ class WarehouseTests(APITestCase):
         """
         Test retrieving a single warehouse with its shelves
         """
-        response = self.client.get(self.warehouse_detail_url(self.warehouse1.id))
+        # 1 warehouse + 1 prefetch of shelves
+        with self.assertNumQueries(2):
+            response = self.client.get(self.detail_url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
         self.assertEqual(response.data['data']['name'], 'Downtown Warehouse')
         self.assertEqual(len(response.data['data']['shelves']), 2)
     
+    def test_get_warehouses_list_query_count_with_many_shelves(self):
+        """
+        Test that the list query count does not grow with the number of warehouses and shelves
+        """
+        warehouses = Warehouse.objects.bulk_create([
+            Warehouse(name=f'Extra Warehouse {i}', address=f'{i} Extra St', city='Denver')
+            for i in range(5)
+        ])
+        Shelf.objects.bulk_create([
+            Shelf(warehouse=warehouse, aisle=aisle, shelf='1', info='Extra')
+            for warehouse in warehouses
+            for aisle in ('A', 'B', 'C')
+        ])
+        
+        with self.assertNumQueries(3):
+            response = self.client.get(WAREHOUSES_URL)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['data']), 7)
+    
     def test_search_warehouses(self):
         """
         Test searching warehouses by name, city, or address
         """
-        # Search by name
-        response = self.client.get(f"{self.warehouses_url}?search=Downtown")
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['data']), 1)
-        self.assertEqual(response.data['data'][0]['name'], 'Downtown Warehouse')
+        cases = [
+            # (search term, expected names)
+            ('Downtown', ['Downtown Warehouse']),  # name
+            ('Chicago', ['Uptown Storage']),  # city
+            ('Broadway', ['Uptown Storage']),  # address
+            ('NonExistent', []),  # no results
+        ]
+        for search, expected_names in cases:
+            with self.subTest(search=search):
+                response = self.get_list_view({'search': search})
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual([warehouse['name'] for warehouse in response.data['data']], expected_names)
+    
+    def test_get_warehouses_list_with_sparse_fields(self):
+        """
+        Test that ?fields= limits the rendered fields and skips loading shelves
+        """
+        # 1 count + 1 page, no shelves prefetch
+        with self.assertNumQueries(2):
+            response = self.get_list_view({'fields': 'id,name'})
         
-        # Search by city
-        response = self.client.get(f"{self.warehouses_url}?search=Chicago")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['data']), 1)
-        self.assertEqual(response.data['data'][0]['name'], 'Uptown Storage')
+        self.assertEqual(
+            response.data['data'],
+            [
+                {'id': self.warehouse1.id, 'name': 'Downtown Warehouse'},
+                {'id': self.warehouse2.id, 'name': 'Uptown Storage'},
+            ]
+        )
+    
+    def test_search_warehouses_with_sparse_fields(self):
+        """
+        Test that search results honour ?fields=
+        """
+        response = self.get_list_view({'search': 'Downtown', 'fields': 'id,name'})
         
-        # Search by address
-        response = self.client.get(f"{self.warehouses_url}?search=Broadway")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['data']), 1)
-        self.assertEqual(response.data['data'][0]['name'], 'Uptown Storage')
+        self.assertEqual(response.data['data'], [{'id': self.warehouse1.id, 'name': 'Downtown Warehouse'}])
+    
+    def test_get_warehouses_list_sparse_fields_ignore_whitespace(self):
+        """
+        Test that spaces around the ?fields= names are ignored
+        """
+        response = self.get_list_view({'fields': ' id, name '})
         
-        # Search with no results
-        response = self.client.get(f"{self.warehouses_url}?search=NonExistent")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['data']), 0)
+        self.assertEqual(set(response.data['data'][0]), {'id', 'name'})
+    
+    def test_get_warehouses_list_unknown_sparse_field(self):
+        """
+        Test that an unknown ?fields= name is rejected
+        """
+        response = self.get_list_view({'fields': 'id,colour'})
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.data['success'])
+        self.assertIn('colour', response.data['errors']['fields'])
     
     def test_sort_warehouses(self):
         """
         Test sorting warehouses by different fields
         """
-        # Sort by name ascending (default)
-        response = self.client.get(f"{self.warehouses_url}?sort_by=name&sort_direction=asc")
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['data'][0]['name'], 'Downtown Warehouse')
-        self.assertEqual(response.data['data'][1]['name'], 'Uptown Storage')
+        cases = [
+            # (sort_by, sort_direction, expected values of the sort field in order)
+            ('name', 'asc', ['Downtown Warehouse', 'Uptown Storage']),
+            ('name', 'desc', ['Uptown Storage', 'Downtown Warehouse']),
+            ('city', 'asc', ['Chicago', 'New York']),
+        ]
+        for sort_by, sort_direction, expected in cases:
+            with self.subTest(sort_by=sort_by, sort_direction=sort_direction):
+                response = self.get_list_view({'sort_by': sort_by, 'sort_direction': sort_direction})
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual([warehouse[sort_by] for warehouse in response.data['data']], expected)
+
+
+class WarehouseWriteTests(WarehouseTestCase):
+    """
+    Tests for creating, updating and deleting warehouses
+    """
+    
+    # Request bodies that do not depend on fixture ids
+    CREATE_BASIC_DATA = {
+        'name': 'West Side Warehouse',
+        'address': '789 West Ave',
+        'city': 'Los Angeles'
+    }
+    
+    CREATE_WITH_SHELVES_DATA = {
+        'name': 'East Side Warehouse',
+        'address': '321 East St',
+        'city': 'Boston',
+        'shelves': [
+            {'aisle': 'C', 'shelf': '3', 'info': 'Books'},
+            {'aisle': 'D', 'shelf': '4', 'info': 'Toys'}
+        ]
+    }
+    
+    # Missing required field (name)
+    INVALID_DATA = {
+        'address': '789 West Ave',
+        'city': 'Los Angeles'
+    }
+    
+    UPDATE_BASIC_DATA = {
+        'name': 'Updated Warehouse Name',
+        'city': 'Updated City'
+    }
+    
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Build the update bodies that refer to the shelf fixtures
+        """
+        super().setUpTestData()
         
-        # Sort by name descending
-        response = self.client.get(f"{self.warehouses_url}?sort_by=name&sort_direction=desc")
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['data'][0]['name'], 'Uptown Storage')
-        self.assertEqual(response.data['data'][1]['name'], 'Downtown Warehouse')
+        cls.add_shelves_data = {
+            'shelves': [
+                {'id': cls.shelf1.id, 'aisle': 'A', 'shelf': '1', 'info': 'Electronics'},
+                {'id': cls.shelf2.id, 'aisle': 'B', 'shelf': '2', 'info': 'Clothing'},
+                {'aisle': 'E', 'shelf': '5', 'info': 'New Shelf'}
+            ]
+        }
         
-        # Sort by city
-        response = self.client.get(f"{self.warehouses_url}?sort_by=city&sort_direction=asc")
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['data'][0]['city'], 'Chicago')
-        self.assertEqual(response.data['data'][1]['city'], 'New York')
+        cls.modify_shelves_data = {
+            'shelves': [
+                {'id': cls.shelf1.id, 'aisle': 'A', 'shelf': '1', 'info': 'Updated Info'},
+                {'id': cls.shelf2.id, 'aisle': 'B', 'shelf': '3', 'info': 'Clothing'}
+            ]
+        }
+        
+        cls.remove_shelves_data = {
+            'shelves': [
+                {'id': cls.shelf1.id, 'aisle': 'A', 'shelf': '1', 'info': 'Electronics'}
+                # shelf2 is omitted, which should delete it
+            ]
+        }
     
     def test_create_warehouse_basic(self):
         """
         Test creating a warehouse without shelves
         """
-        data = {
-            'name': 'West Side Warehouse',
-            'address': '789 West Ave',
-            'city': 'Los Angeles'
-        }
-        
-        response = self.client.post(
-            self.warehouses_url,
-            data=json.dumps(data),
-            content_type='application/json'
-        )
+        response = self.client.post(WAREHOUSES_URL, self.CREATE_BASIC_DATA, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(response.data['success'])
         self.assertEqual(response.data['data']['name'], 'West Side Warehouse')
-        
-        # Verify warehouse was created in database
-        self.assertTrue(Warehouse.objects.filter(name='West Side Warehouse').exists())
     
     def test_create_warehouse_with_shelves(self):
         """
         Test creating a warehouse with shelves
         """
-        data = {
-            'name': 'East Side Warehouse',
-            'address': '321 East St',
-            'city': 'Boston',
-            'shelves': [
-                {'aisle': 'C', 'shelf': '3', 'info': 'Books'},
-                {'aisle': 'D', 'shelf': '4', 'info': 'Toys'}
-            ]
-        }
-        
-        response = self.client.post(
-            self.warehouses_url,
-            data=json.dumps(data),
-            content_type='application/json'
-        )
+        response = self.client.post(WAREHOUSES_URL, self.CREATE_WITH_SHELVES_DATA, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(response.data['success'])
         self.assertEqual(response.data['data']['name'], 'East Side Warehouse')
-        self.assertEqual(len(response.data['data']['shelves']), 2)
         
         # Verify warehouse and shelves were created in database
-        warehouse = Warehouse.objects.get(name='East Side Warehouse')
-        self.assertEqual(warehouse.shelves.count(), 2)
-        self.assertTrue(warehouse.shelves.filter(aisle='C', shelf='3').exists())
-        self.assertTrue(warehouse.shelves.filter(aisle='D', shelf='4').exists())
+        shelves = Shelf.objects.filter(warehouse__name='East Side Warehouse').values_list('aisle', 'shelf')
+        self.assertCountEqual(shelves, [('C', '3'), ('D', '4')])
     
     def test_create_warehouse_invalid_data(self):
         """
         Test creating a warehouse with invalid data
         """
-        # Missing required field (name)
-        data = {
-            'address': '789 West Ave',
-            'city': 'Los Angeles'
-        }
-        
-        response = self.client.post(
-            self.warehouses_url,
-            data=json.dumps(data),
-            content_type='application/json'
-        )
+        response = self.client.post(WAREHOUSES_URL, self.INVALID_DATA, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertFalse(response.data['success'])
@@ -209,105 +293,51 @@ class WarehouseTests(APITestCase):
         """
         Test updating basic warehouse information
         """
-        data = {
-            'name': 'Updated Warehouse Name',
-            'city': 'Updated City'
-        }
-        
-        response = self.client.put(
-            self.warehouse_detail_url(self.warehouse1.id),
-            data=json.dumps(data),
-            content_type='application/json'
-        )
+        response = self.client.put(self.detail_url, self.UPDATE_BASIC_DATA, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
         self.assertEqual(response.data['data']['name'], 'Updated Warehouse Name')
         self.assertEqual(response.data['data']['city'], 'Updated City')
-        
-        # Verify warehouse was updated in database
-        self.warehouse1.refresh_from_db()
-        self.assertEqual(self.warehouse1.name, 'Updated Warehouse Name')
-        self.assertEqual(self.warehouse1.city, 'Updated City')
     
     def test_update_warehouse_add_shelves(self):
         """
         Test adding new shelves to a warehouse
         """
-        data = {
-            'shelves': [
-                {'id': self.shelf1.id, 'aisle': 'A', 'shelf': '1', 'info': 'Electronics'},
-                {'id': self.shelf2.id, 'aisle': 'B', 'shelf': '2', 'info': 'Clothing'},
-                {'aisle': 'E', 'shelf': '5', 'info': 'New Shelf'}
-            ]
-        }
-        
-        response = self.client.put(
-            self.warehouse_detail_url(self.warehouse1.id),
-            data=json.dumps(data),
-            content_type='application/json'
-        )
+        response = self.client.put(self.detail_url, self.add_shelves_data, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
-        self.assertEqual(len(response.data['data']['shelves']), 3)
         
         # Verify new shelf in database
-        self.warehouse1.refresh_from_db()
-        self.assertEqual(self.warehouse1.shelves.count(), 3)
-        self.assertTrue(self.warehouse1.shelves.filter(aisle='E', shelf='5').exists())
+        shelves = self.warehouse1.shelves.values_list('aisle', 'shelf')
+        self.assertCountEqual(shelves, [('A', '1'), ('B', '2'), ('E', '5')])
     
     def test_update_warehouse_modify_shelves(self):
         """
         Test modifying existing shelves in a warehouse
         """
-        data = {
-            'shelves': [
-                {'id': self.shelf1.id, 'aisle': 'A', 'shelf': '1', 'info': 'Updated Info'},
-                {'id': self.shelf2.id, 'aisle': 'B', 'shelf': '3', 'info': 'Clothing'}
-            ]
-        }
-        
-        response = self.client.put(
-            self.warehouse_detail_url(self.warehouse1.id),
-            data=json.dumps(data),
-            content_type='application/json'
-        )
+        response = self.client.put(self.detail_url, self.modify_shelves_data, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
         
         # Verify shelf updates in database
-        self.shelf1.refresh_from_db()
-        self.shelf2.refresh_from_db()
-        self.assertEqual(self.shelf1.info, 'Updated Info')
-        self.assertEqual(self.shelf2.shelf, '3')
+        self.assertEqual(Shelf.objects.values_list('info', flat=True).get(pk=self.shelf1.pk), 'Updated Info')
+        self.assertEqual(Shelf.objects.values_list('shelf', flat=True).get(pk=self.shelf2.pk), '3')
     
     def test_update_warehouse_remove_shelves(self):
         """
         Test removing shelves from a warehouse
         """
-        data = {
-            'shelves': [
-                {'id': self.shelf1.id, 'aisle': 'A', 'shelf': '1', 'info': 'Electronics'}
-                # shelf2 is omitted, which should delete it
-            ]
-        }
-        
-        response = self.client.put(
-            self.warehouse_detail_url(self.warehouse1.id),
-            data=json.dumps(data),
-            content_type='application/json'
-        )
+        response = self.client.put(self.detail_url, self.remove_shelves_data, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
-        self.assertEqual(len(response.data['data']['shelves']), 1)
         
         # Verify shelf was deleted from database
-        self.warehouse1.refresh_from_db()
-        self.assertEqual(self.warehouse1.shelves.count(), 1)
-        self.assertFalse(self.warehouse1.shelves.filter(id=self.shelf2.id).exists())
+        shelf_ids = self.warehouse1.shelves.values_list('id', flat=True)
+        self.assertEqual(list(shelf_ids), [self.shelf1.id])
     
     def test_delete_warehouse(self):
         """
@@ -317,7 +347,7 @@ class WarehouseTests(APITestCase):
         warehouse_count_before = Warehouse.objects.count()
         shelf_count_before = Shelf.objects.count()
         
-        response = self.client.delete(self.warehouse_detail_url(self.warehouse1.id))
+        response = self.client.delete(self.detail_url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
@@ -329,27 +359,24 @@ class WarehouseTests(APITestCase):
         # Verify shelves were deleted (cascade delete)
         self.assertEqual(Shelf.objects.count(), shelf_count_before - 2)
         self.assertFalse(Shelf.objects.filter(warehouse_id=self.warehouse1.id).exists())
+
+class WarehouseUnauthenticatedTests(APISimpleTestCase):
+    """
+    Warehouse API checks that never reach the database
+    """
     
     def test_unauthenticated_access(self):
         """
         Test that unauthenticated users cannot access the API
         """
-        # Log out
-        self.client.force_authenticate(user=None)
-        
-        # Try to access warehouses list
-        response = self.client.get(self.warehouses_url)
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-        
-        # Try to access warehouse detail
-        response = self.client.get(self.warehouse_detail_url(self.warehouse1.id))
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-        
-        # Try to create a warehouse
-        data = {'name': 'Test Warehouse', 'address': 'Test Address', 'city': 'Test City'}
-        response = self.client.post(
-            self.warehouses_url,
-            data=json.dumps(data),
-            content_type='application/json'
-        )
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
+        # Authentication fails before the warehouse is looked up, so any pk works
+        detail_url = reverse('admin_api:warehouse-detail', kwargs={'pk': 1})
+        requests = [
+            ('get', WAREHOUSES_URL, None),
+            ('get', detail_url, None),
+            ('post', WAREHOUSES_URL, {'name': 'Test Warehouse', 'address': 'Test Address', 'city': 'Test City'}),
+        ]
+        for method, url, data in requests:
+            with self.subTest(method=method, url=url):
+                response = getattr(self.client, method)(url, data, format='json')
+                self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file